@@ -1,7 +1,11 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from concurrent.futures import ThreadPoolExecutor
 import os
-from neo4j_connection import Neo4jConnection
-from visualizations import GraphVisualizer
+import re
+import math
+from neo4j_connection import Neo4jConnection, MAX_CONNECTION_POOL_SIZE, CONNECTION_ACQUISITION_TIMEOUT
+from visualizations import GraphVisualizer, GRAPH_MAX_BYTES
 from claude_conduit import ClaudeConduitClient
 import pandas as pd
 
@@ -14,26 +18,131 @@ st.set_page_config(
 st.title("🧠 Knowledge Graph Dashboard")
 st.markdown("Interactive visualization for Tool Claude Conduit's knowledge graph")
 
-@st.cache_resource
+# Values are passed as parameters rather than baked into the Cypher text so
+# Neo4j can reuse one cached plan per query regardless of the values.
+PREDEFINED_QUERIES = {
+    "Show all nodes": ("MATCH (n) RETURN n LIMIT $limit", {"limit": 25}),
+    "Count by label": ("MATCH (n) RETURN labels(n)[0] as label, count(*) as count", {}),
+    "Recent PRs": (
+        "MATCH (pr:PullRequest) "
+        "WHERE ($cursor IS NULL AND pr.created_at IS NOT NULL) OR pr.created_at < datetime($cursor) "
+        "RETURN pr ORDER BY pr.created_at DESC LIMIT $limit",
+        {"cursor": None, "limit": 10}
+    ),
+    "Agent interactions": (
+        "MATCH (a1:Agent)-[r]->(a2:Agent) WHERE a1.id IS NOT NULL "
+        "RETURN a1, r, a2 ORDER BY a1.id LIMIT $limit",
+        {"limit": 25}
+    )
+}
+
+@st.cache_resource(show_spinner=False)
 def get_neo4j_connection():
     try:
         conn = Neo4jConnection(
             uri=os.getenv("NEO4J_URI", "bolt://localhost:7687"),
             user=os.getenv("NEO4J_USER", "neo4j"),
-            password=os.getenv("NEO4J_PASSWORD", "password")
+            password=os.getenv("NEO4J_PASSWORD", "password"),
+            database=os.getenv("NEO4J_DATABASE", "neo4j"),
+            max_connection_pool_size=int(os.getenv("NEO4J_MAX_POOL_SIZE", MAX_CONNECTION_POOL_SIZE)),
+            connection_acquisition_timeout=float(
+                os.getenv("NEO4J_ACQUISITION_TIMEOUT", CONNECTION_ACQUISITION_TIMEOUT)
+            )
         )
-        # Test the connection
+        # Test the connection. verify_connectivity fails fast when the server
+        # is down, where execute_query would keep retrying the transaction.
+        conn.driver.verify_connectivity()
         conn.execute_query("RETURN 1 as test")
+        conn.ensure_indexes()
+        conn.start_growth_refresh()
+        conn.warm_query_plans(
+            (with_row_limit(query), params) for query, params in PREDEFINED_QUERIES.values()
+        )
         return conn
     except Exception:
         return None
 
+# One visualizer per connection, so its query cache survives reruns. Graph
+# and bootstrap reads go through that cache alone, not st.cache_data too
+@st.cache_resource(show_spinner=False)
+def get_visualizer(_conn):
+    return GraphVisualizer(_conn)
+
 @st.cache_resource
 def get_conduit_client():
     return ClaudeConduitClient(
         base_url=os.getenv("CONDUIT_URL", "http://localhost:3001")
     )
 
+# Service status is polled on every rerun, so it is only re-fetched every few seconds
+STATUS_CACHE_TTL = 10
+
+@st.cache_data(ttl=STATUS_CACHE_TTL, show_spinner=False)
+def cached_health_check(_conduit):
+    return _conduit.health_check()
+
+@st.cache_data(ttl=STATUS_CACHE_TTL, show_spinner=False)
+def cached_fortune(_conduit):
+    return _conduit.get_fortune()
+
+# The tool catalog rarely changes, but typing in the MCP Tools payload box reruns the page
+TOOLS_CACHE_TTL = 30
+
+@st.cache_data(ttl=TOOLS_CACHE_TTL, show_spinner=False)
+def cached_available_tools(_conduit):
+    return _conduit.get_available_tools()
+
+def load_service_status(conduit):
+    # The conduit health check, fortune and Neo4j connection are independent
+    # round-trips; run them together so the sidebar waits for the slowest one
+    # instead of all three. Workers share the script context the caches need.
+    with ThreadPoolExecutor(max_workers=3, initializer=add_script_run_ctx,
+                            initargs=(None, get_script_run_ctx())) as executor:
+        health = executor.submit(cached_health_check, conduit)
+        fortune = executor.submit(cached_fortune, conduit)
+        conn = executor.submit(get_neo4j_connection)
+        return health.result(), fortune.result(), conn.result()
+
+ACTIVITY_PAGE_SIZES = [10, 20, 50]
+QUERY_PAGE_SIZES = [20, 50, 100]
+# Custom queries without a LIMIT are capped so one MATCH (n) can't flood the browser
+QUERY_ROW_LIMIT = 1000
+
+# Just enough of a Cypher lexer to find top-level clauses: comments and
+# quoted text are skipped whole, brackets track subquery and map nesting
+_CYPHER_TOKEN = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*"|`[^`]*`)
+  | (?P<word>\w+)
+  | (?P<open>[{(\[])
+  | (?P<close>[})\]])
+  | (?P<other>\S)
+""", re.VERBOSE | re.DOTALL)
+_CYPHER_CLAUSES = frozenset([
+    "MATCH", "OPTIONAL", "WITH", "UNWIND", "CALL", "RETURN", "LIMIT", "UNION",
+    "CREATE", "MERGE", "SET", "DELETE", "DETACH", "REMOVE", "FOREACH", "LOAD", "FINISH"
+])
+
+# Every widget interaction reruns the script, so graph reads are memoized for
+# a minute. Leading underscores keep Streamlit from hashing the connection.
+QUERY_CACHE_TTL = 60
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def cached_graph_statistics(_conn):
+    return _conn.get_graph_statistics()
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def cached_recent_activity(_conn, limit, cursor=None):
+    return _conn.get_recent_activity(limit=limit, cursor=cursor)
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def cached_graph_metrics(_conn):
+    return _conn.calculate_graph_metrics()
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def cached_usage_patterns(_conn):
+    return _conn.get_usage_patterns()
+
 def main():
     with st.sidebar:
         st.header("Navigation")
@@ -52,10 +161,14 @@ def main():
         
         node_limit = st.slider("Max Nodes", 10, 500, 100)
         
+        refresh = st.button("🔄 Refresh")
+        if refresh:
+            st.cache_data.clear()
+        
         st.markdown("---")
         st.header("Claude Conduit Status")
         conduit = get_conduit_client()
-        health = conduit.health_check()
+        health, fortune, conn = load_service_status(conduit)
         if health.get("status") == "healthy":
             st.success("🟢 Connected")
             st.caption(f"v{health.get('version', 'unknown')}")
@@ -63,13 +176,9 @@ def main():
             st.error("🔴 Disconnected")
             st.caption("Start claude-conduit to enable MCP features")
         
-        fortune = conduit.get_fortune()
         if fortune != "Fortune service unavailable":
             st.info(f"💭 {fortune}")
     
-    conn = get_neo4j_connection()
-    conduit = get_conduit_client()
-    
     # Show Neo4j status in sidebar
     if conn is None:
         st.sidebar.warning("🔴 Neo4j Offline")
@@ -78,7 +187,9 @@ def main():
         st.sidebar.success("🟢 Neo4j Connected")
     
     # Initialize visualizer only if Neo4j is available
-    visualizer = GraphVisualizer(conn) if conn else None
+    visualizer = get_visualizer(conn) if conn else None
+    if refresh and visualizer:
+        visualizer.invalidate_cache()
     
     if page == "Overview":
         show_overview(conn)
@@ -159,7 +270,7 @@ def show_overview(conn):
     # Original overview with Neo4j
     col1, col2, col3, col4 = st.columns(4)
     
-    stats = conn.get_graph_statistics()
+    stats = cached_graph_statistics(conn)
     
     with col1:
         st.metric("Total Nodes", stats.get("node_count", 0))
@@ -176,11 +287,25 @@ def show_overview(conn):
     
     with col1:
         st.subheader("Recent Activity")
-        activity = conn.get_recent_activity(limit=10)
+        page_size = st.selectbox("Rows per page", ACTIVITY_PAGE_SIZES, key="activity_page_size")
+        cursor = st.session_state.get("activity_cursor")
+        activity = cached_recent_activity(conn, limit=page_size, cursor=cursor)
         if activity is not None and not activity.empty:
-            st.dataframe(activity)
+            st.dataframe(activity.drop(columns="element_id"))
         else:
-            st.info("No recent activity found")
+            st.info("No recent activity found" if cursor is None else "No older activity")
+        
+        # A full page may be the last one, so the way back is shown even when
+        # the older page comes up empty
+        newer_col, older_col = st.columns(2)
+        if cursor and newer_col.button("⏮ Newest"):
+            del st.session_state["activity_cursor"]
+            st.rerun()
+        if activity is not None and len(activity) == page_size and older_col.button("Older ▶"):
+            # The next page starts strictly after the last row shown
+            last = activity.iloc[-1]
+            st.session_state["activity_cursor"] = (last["created_at"], last["element_id"])
+            st.rerun()
     
     with col2:
         st.subheader("System Health")
@@ -191,6 +316,9 @@ def show_overview(conn):
             else:
                 st.error(f"❌ {component}")
 
+# Above this many nodes the vis.js embed is swapped for a WebGL plot
+WEBGL_NODE_THRESHOLD = 250
+
 def show_knowledge_graph(visualizer, layout_type, node_limit):
     st.header("🌐 Knowledge Graph Visualization")
     
@@ -198,14 +326,15 @@ def show_knowledge_graph(visualizer, layout_type, node_limit):
     
     with col2:
         st.subheader("Filters")
-        node_types = visualizer.get_node_types()
+        bootstrap = visualizer.dashboard_bootstrap()
+        node_types = bootstrap["node_types"]
         selected_types = st.multiselect(
             "Node Types",
             node_types,
             default=node_types[:3] if len(node_types) > 3 else node_types
         )
         
-        relationship_types = visualizer.get_relationship_types()
+        relationship_types = bootstrap["relationship_types"]
         selected_rels = st.multiselect(
             "Relationship Types",
             relationship_types,
@@ -213,17 +342,35 @@ def show_knowledge_graph(visualizer, layout_type, node_limit):
         )
         
         search_term = st.text_input("Search nodes", "")
+        expand_id = st.text_input("Expand node (id)", "")
         
     with col1:
         if st.button("Generate Graph"):
             with st.spinner("Loading graph..."):
-                graph_html = visualizer.create_interactive_graph(
+                graph_args = dict(
                     node_types=selected_types,
                     relationship_types=selected_rels,
                     layout=layout_type,
                     limit=node_limit,
                     search_term=search_term
                 )
+                if node_limit > WEBGL_NODE_THRESHOLD:
+                    fig = visualizer.create_webgl_graph(**graph_args)
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    graph_html = visualizer.create_interactive_graph(**graph_args)
+                    st.components.v1.html(graph_html, height=600)
+                if visualizer.graph_truncated(selected_types, selected_rels, node_limit, search_term):
+                    st.caption(
+                        "Graph stopped short of the node limit once its data passed "
+                        f"{GRAPH_MAX_BYTES // 1_000_000} MB; narrow the filters to see the rest"
+                    )
+        
+        if expand_id and st.button("Expand Node"):
+            with st.spinner("Loading neighborhood..."):
+                graph_html = visualizer.create_neighborhood_graph(
+                    expand_id, layout=layout_type, limit=node_limit
+                )
                 st.components.v1.html(graph_html, height=600)
 
 def show_process_flow(visualizer):
@@ -236,85 +383,146 @@ def show_process_flow(visualizer):
     
     if process_type == "PR Workflow":
         st.subheader("Pull Request Workflow")
-        workflow_data = visualizer.get_pr_workflow()
-        if workflow_data:
+        workflow_data = visualizer.dashboard_bootstrap()["pr_workflow"]
+        if not workflow_data.empty:
             fig = visualizer.create_sankey_diagram(workflow_data)
             st.plotly_chart(fig, use_container_width=True)
     
     elif process_type == "Agent Coordination":
         st.subheader("Multi-Agent Coordination")
-        coord_data = visualizer.get_agent_coordination()
-        if coord_data:
+        coord_data = visualizer.dashboard_bootstrap()["agent_coordination"]
+        if not coord_data.empty:
             fig = visualizer.create_flow_diagram(coord_data)
             st.plotly_chart(fig, use_container_width=True)
 
+def show_metrics_panel(metrics):
+    st.subheader("Graph Metrics")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Average Degree", f"{metrics.get('avg_degree', 0):.2f}")
+        st.metric("Density", f"{metrics.get('density', 0):.4f}")
+    with col2:
+        st.metric("Clustering Coefficient", f"{metrics.get('clustering', 0):.4f}")
+        st.metric("Components", metrics.get('components', 0))
+
+def show_growth_panel(growth_data):
+    st.subheader("Growth Tracking")
+    if growth_data is None:
+        st.info("Growth data is still being computed")
+    elif not growth_data.empty:
+        st.line_chart(growth_data)
+
+def show_patterns_panel(patterns):
+    st.subheader("Usage Patterns")
+    if patterns is not None:
+        st.bar_chart(patterns)
+
+# Each panel is a loader that runs its queries and a renderer for the result.
+# Growth reads the snapshot the connection refreshes in the background.
+ANALYTICS_PANELS = {
+    "Metrics": (cached_graph_metrics, show_metrics_panel),
+    "Growth": (lambda conn: conn.get_growth_data(), show_growth_panel),
+    "Patterns": (cached_usage_patterns, show_patterns_panel)
+}
+
+def render_panel(panel_id, conn):
+    # The skeleton stays up while the panel's queries run; only once they
+    # return does the rendered panel replace it in the same slot
+    load, show = ANALYTICS_PANELS[panel_id]
+    slot = st.empty()
+    slot.info(f"⏳ Loading {panel_id.lower()}...")
+    data = load(conn)
+    with slot.container():
+        show(data)
+
 def show_analytics(conn):
     st.header("📈 Analytics Dashboard")
     
-    tab1, tab2, tab3 = st.tabs(["Metrics", "Growth", "Patterns"])
-    
-    with tab1:
-        st.subheader("Graph Metrics")
-        metrics = conn.calculate_graph_metrics()
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Average Degree", f"{metrics.get('avg_degree', 0):.2f}")
-            st.metric("Density", f"{metrics.get('density', 0):.4f}")
-        with col2:
-            st.metric("Clustering Coefficient", f"{metrics.get('clustering', 0):.4f}")
-            st.metric("Components", metrics.get('components', 0))
-    
-    with tab2:
-        st.subheader("Growth Tracking")
-        growth_data = conn.get_growth_data()
-        if not growth_data.empty:
-            st.line_chart(growth_data)
-    
-    with tab3:
-        st.subheader("Usage Patterns")
-        patterns = conn.get_usage_patterns()
-        if patterns:
-            st.bar_chart(patterns)
+    # st.tabs runs every tab's queries on each rerun; only the chosen panel is built here
+    panel_id = st.radio("Panel", list(ANALYTICS_PANELS), horizontal=True,
+                        label_visibility="collapsed", key="analytics_panel")
+    render_panel(panel_id, conn)
 
 def show_query_explorer(conn):
     st.header("🔍 Query Explorer")
     
     st.markdown("Execute custom Cypher queries on the knowledge graph")
     
-    predefined_queries = {
-        "Show all nodes": "MATCH (n) RETURN n LIMIT 25",
-        "Count by label": "MATCH (n) RETURN labels(n)[0] as label, count(*) as count",
-        "Recent PRs": "MATCH (pr:PullRequest) RETURN pr ORDER BY pr.created_at DESC LIMIT 10",
-        "Agent interactions": "MATCH (a1:Agent)-[r]->(a2:Agent) RETURN a1, r, a2 LIMIT 25"
-    }
-    
     query_type = st.radio("Query Type", ["Predefined", "Custom"])
     
     if query_type == "Predefined":
-        selected_query = st.selectbox("Select Query", list(predefined_queries.keys()))
-        query = predefined_queries[selected_query]
+        selected_query = st.selectbox("Select Query", list(PREDEFINED_QUERIES.keys()))
+        query, params = PREDEFINED_QUERIES[selected_query]
         st.code(query, language="cypher")
+        if params:
+            st.caption(f"Parameters: {params}")
     else:
         query = st.text_area("Enter Cypher Query", height=100)
+        params = {}
     
     if st.button("Execute Query"):
         if query:
             with st.spinner("Executing query..."):
                 try:
-                    results = conn.execute_query(query)
-                    if results:
-                        st.success(f"Found {len(results)} results")
-                        st.dataframe(results)
-                    else:
-                        st.info("Query returned no results")
+                    results = conn.execute_query(with_row_limit(query), params)
+                    # Kept in session state so paging through results doesn't re-run the query
+                    st.session_state["query_results"] = pd.DataFrame(results)
                 except Exception as e:
+                    st.session_state.pop("query_results", None)
                     st.error(f"Query error: {str(e)}")
+    
+    results = st.session_state.get("query_results")
+    if results is not None:
+        if not results.empty:
+            st.success(f"Found {len(results)} results")
+            if len(results) == QUERY_ROW_LIMIT:
+                st.caption(f"Results are capped at {QUERY_ROW_LIMIT} rows; add a LIMIT to change this")
+            show_paginated_dataframe(results, key="query")
+        else:
+            st.info("Query returned no results")
+
+def with_row_limit(query):
+    # LIMIT is appended as text, so it's only added when the last top-level
+    # clause is a RETURN, after trailing comments and semicolons are cut off.
+    # UNION is left alone, since a LIMIT there would bind the last branch only.
+    depth, end, previous, clauses = 0, 0, "", []
+    for token in _CYPHER_TOKEN.finditer(query):
+        kind, text = token.lastgroup, token.group()
+        if kind == "comment":
+            continue
+        if kind == "open":
+            depth += 1
+        elif kind == "close":
+            depth -= 1
+        elif (kind == "word" and depth == 0 and text.upper() in _CYPHER_CLAUSES
+              and previous != "." and previous.upper() not in ("STARTS", "ENDS")):
+            clauses.append(text.upper())
+        if text != ";":
+            end = token.end()
+        previous = text
+    query = query[:end]
+    if clauses and clauses[-1] == "RETURN" and "UNION" not in clauses:
+        return f"{query} LIMIT {QUERY_ROW_LIMIT}"
+    return query
+
+def show_paginated_dataframe(df, key):
+    # Only the visible slice is sent to the browser
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", QUERY_PAGE_SIZES, key=f"{key}_page_size")
+    page_count = max(1, math.ceil(len(df) / page_size))
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key=f"{key}_page")
+    
+    start = (page - 1) * page_size
+    st.dataframe(df.iloc[start:start + page_size])
+    st.caption(f"Page {page} of {page_count}")
 
 def show_mcp_tools(conduit):
     st.header("🛠️ MCP Tools Explorer")
     
-    tools_data = conduit.get_available_tools()
+    tools_data = cached_available_tools(conduit)
     
     if "error" in tools_data:
         st.error(f"Failed to fetch tools: {tools_data['error']}")
@@ -415,15 +623,17 @@ def show_task_planning(conduit):
     
     if st.button("Save Current Plan"):
         if 'task_plan' in st.session_state:
-            result = conduit.save_to_cloud_memory(
-                f"task_plan_{task_description[:30]}",
-                st.session_state['task_plan'],
-                "planning"
-            )
-            if "error" not in result:
+            # The plan and its boost (if any) are stored in one batched request
+            entries = {f"task_plan_{task_description[:30]}": st.session_state['task_plan']}
+            if 'planning_boost' in st.session_state:
+                entries[f"planning_boost_{task_description[:30]}"] = st.session_state['planning_boost']
+            
+            results = conduit.save_all_to_cloud_memory(entries, "planning")
+            errors = [result.get('error') for result in results if "error" in result]
+            if not errors:
                 st.success("Plan saved to cloud memory!")
             else:
-                st.error(f"Save failed: {result.get('error')}")
+                st.error(f"Save failed: {errors[0]}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,16 +1,40 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 import json
-from typing import Dict, Any, List, Optional
+import gzip
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+# JSON bodies larger than this are gzipped before they go on the wire
+GZIP_MIN_BYTES = 1024
+
 class ClaudeConduitClient:
-    def __init__(self, base_url: str = "http://localhost:3001"):
+    def __init__(self, base_url: str = "http://localhost:3001", timeout: float = 5,
+                 tool_timeout: float = 60):
         self.base_url = base_url
+        self.timeout = timeout
+        # Tool execution waits on MCP servers, so it gets a longer read timeout
+        self.tool_timeout = tool_timeout
         self.session = requests.Session()
+        
+        # Keep-alive connection pool so repeated calls skip the TCP/TLS handshake.
+        # Retry's defaults only cover idempotent methods, so tool POSTs never replay.
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504])
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
     
     def health_check(self) -> Dict[str, Any]:
         try:
-            response = self.session.get(f"{self.base_url}/health")
+            response = self.session.get(f"{self.base_url}/health", timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -18,7 +42,7 @@ class ClaudeConduitClient:
     
     def get_fortune(self) -> str:
         try:
-            response = self.session.get(f"{self.base_url}/fortune")
+            response = self.session.get(f"{self.base_url}/fortune", timeout=self.timeout)
             response.raise_for_status()
             return response.json().get("fortune", "No fortune available")
         except requests.exceptions.RequestException:
@@ -26,23 +50,62 @@ class ClaudeConduitClient:
     
     def get_available_tools(self) -> Dict[str, Any]:
         try:
-            response = self.session.get(f"{self.base_url}/tools")
+            response = self.session.get(f"{self.base_url}/tools", timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return {"error": str(e), "mcp": {}, "plugins": []}
     
+    def _post_json(self, url: str, body: Any, timeout: float) -> requests.Response:
+        # Task plans and memory entries can be large; the conduit's express.json()
+        # inflates gzip request bodies transparently
+        data = json.dumps(body).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if len(data) > GZIP_MIN_BYTES:
+            data = gzip.compress(data)
+            headers["Content-Encoding"] = "gzip"
+        return self.session.post(url, data=data, headers=headers, timeout=timeout)
+    
     def execute_tool(self, server: str, tool: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            response = self.session.post(
+            response = self._post_json(
                 f"{self.base_url}/execute/{server}/{tool}",
-                json=payload
+                payload,
+                self.tool_timeout
             )
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             return {"error": str(e), "status": "failed"}
     
+    def execute_tools(self, calls: List[Tuple[str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        # Independent (server, tool, payload) calls share the keep-alive pool and
+        # overlap their round-trips; results keep the order of the calls
+        if not calls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(calls), POOL_MAXSIZE)) as executor:
+            return list(executor.map(lambda call: self.execute_tool(*call), calls))
+    
+    def execute_tools_batch(self, calls: List[Tuple[str, str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        # One POST carries the whole batch; conduits that predate /execute-batch
+        # answer 404, in which case the calls go out concurrently instead
+        if not calls:
+            return []
+        body = [{"server": server, "tool": tool, "payload": payload} for server, tool, payload in calls]
+        try:
+            response = self._post_json(f"{self.base_url}/execute-batch", body, self.tool_timeout)
+            if response.status_code == 404:
+                return self.execute_tools(calls)
+            response.raise_for_status()
+            results = response.json().get("results", [])
+            if len(results) != len(calls):
+                # Results are matched to calls by position, so a short list can't be trusted
+                error = f"Batch returned {len(results)} results for {len(calls)} calls"
+                return [{"error": error, "status": "failed"} for _ in calls]
+            return results
+        except requests.exceptions.RequestException as e:
+            return [{"error": str(e), "status": "failed"} for _ in calls]
+    
     def get_task_planning(self, task_description: str) -> Dict[str, Any]:
         payload = {
             "task": task_description,
@@ -65,13 +128,21 @@ class ClaudeConduitClient:
         }
         return self.execute_tool("scout", "research", payload)
     
-    def save_to_cloud_memory(self, key: str, value: Any, category: str = "dashboard") -> Dict[str, Any]:
+    def _cloud_memory_store_call(self, key: str, value: Any, category: str) -> Tuple[str, str, Dict[str, Any]]:
         payload = {
             "key": f"{category}/{key}",
             "value": value,
             "timestamp": datetime.now().isoformat()
         }
-        return self.execute_tool("cloud-memory", "store", payload)
+        return ("cloud-memory", "store", payload)
+    
+    def save_to_cloud_memory(self, key: str, value: Any, category: str = "dashboard") -> Dict[str, Any]:
+        return self.execute_tool(*self._cloud_memory_store_call(key, value, category))
+    
+    def save_all_to_cloud_memory(self, entries: Dict[str, Any], category: str = "dashboard") -> List[Dict[str, Any]]:
+        return self.execute_tools_batch([
+            self._cloud_memory_store_call(key, value, category) for key, value in entries.items()
+        ])
     
     def get_from_cloud_memory(self, key: str, category: str = "dashboard") -> Dict[str, Any]:
         payload = {
@@ -83,7 +154,8 @@ class ClaudeConduitClient:
         try:
             response = self.session.post(
                 f"{self.base_url}/planning-boost",
-                json={"task": task}
+                json={"task": task},
+                timeout=self.tool_timeout
             )
             response.raise_for_status()
             return response.json()
@@ -94,7 +166,8 @@ class ClaudeConduitClient:
         try:
             response = self.session.post(
                 f"{self.base_url}/profile/{profile_name}",
-                json=config or {}
+                json=config or {},
+                timeout=self.timeout
             )
             response.raise_for_status()
             return response.json()
@@ -103,7 +176,7 @@ class ClaudeConduitClient:
     
     def get_profiles(self) -> Dict[str, Any]:
         try:
-            response = self.session.get(f"{self.base_url}/profiles")
+            response = self.session.get(f"{self.base_url}/profiles", timeout=self.timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -1,46 +1,201 @@
 from neo4j import GraphDatabase
+from neo4j.exceptions import ClientError, DriverError, Neo4jError, ServiceUnavailable
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
 import pandas as pd
 from datetime import datetime, timedelta
+import threading
+
+# Records pulled per network round-trip when streaming results
+FETCH_SIZE = 1000
+
+# Small pool that gives up quickly, so an unreachable server fails the rerun
+# instead of blocking the Streamlit thread in the driver's default 60s wait
+MAX_CONNECTION_POOL_SIZE = 10
+CONNECTION_ACQUISITION_TIMEOUT = 2
+
+# Node labels the dashboard draws; each gets an id index and full-text search
+GRAPH_LABELS = ("PullRequest", "Agent", "Task", "Knowledge", "Memory", "Plugin", "Tool", "Workflow")
+
+# Created on connect by ensure_indexes; every statement must be idempotent
+INDEX_STATEMENTS = [
+    # Range index so "newest first" queries walk the index instead of sorting every node
+    "CREATE INDEX pull_request_created_at IF NOT EXISTS FOR (pr:PullRequest) ON (pr.created_at)",
+    # Lets agent queries seek and order by id rather than scanning every :Agent
+    "CREATE INDEX agent_id IF NOT EXISTS FOR (a:Agent) ON (a.id)",
+    # Backs the graph search box. The keyword analyzer indexes each value as a
+    # single case-sensitive token, so a *term* wildcard matches like CONTAINS
+    "CREATE FULLTEXT INDEX node_search IF NOT EXISTS "
+    f"FOR (n:{'|'.join(GRAPH_LABELS)}) ON EACH [n.name, n.id] "
+    "OPTIONS {indexConfig: {`fulltext.analyzer`: 'keyword'}}"
+] + [
+    # Seeks for expanding a node by id in the graph view
+    f"CREATE INDEX {label.lower()}_id IF NOT EXISTS FOR (n:{label}) ON (n.id)"
+    for label in GRAPH_LABELS if label != "Agent"
+]
+
+# Daily node-creation counts for the growth chart. This scans every node, so
+# it runs on a background timer (start_growth_refresh) and never from a page
+# render; the result is kept in memory rather than written back to the graph
+GROWTH_QUERY = """
+MATCH (n)
+WHERE n.created_at IS NOT NULL
+RETURN toString(date(n.created_at)) as day, count(n) as count
+ORDER BY day
+"""
+
+# Seconds between growth snapshot recomputations
+GROWTH_REFRESH_INTERVAL = 15 * 60
+
+# Per-label counts straight from the count store
+APOC_USAGE_QUERY = """
+CALL apoc.meta.stats() YIELD labels
+UNWIND keys(labels) as type
+WITH type, labels[type] as count
+WHERE count > 0
+RETURN type, count
+ORDER BY count DESC
+"""
+
+USAGE_QUERY = """
+MATCH (n)
+RETURN labels(n)[0] as type, count(*) as count
+ORDER BY count DESC
+"""
+
+STATISTICS_KEYS = ("node_count", "relationship_count", "label_count", "relationship_type_count")
+
+# Reads the count store through APOC: one O(1) metadata lookup
+APOC_STATISTICS_QUERY = """
+CALL apoc.meta.stats() YIELD nodeCount, relCount, labelCount, relTypeCount
+RETURN nodeCount as node_count, relCount as relationship_count,
+       labelCount as label_count, relTypeCount as relationship_type_count
+"""
+
+# Same statistics in a single round-trip for databases without APOC
+GRAPH_STATISTICS_QUERY = """
+CALL { MATCH (n) RETURN count(n) as node_count }
+CALL { MATCH ()-[r]->() RETURN count(r) as relationship_count }
+CALL { CALL db.labels() YIELD label RETURN count(label) as label_count }
+CALL { CALL db.relationshipTypes() YIELD relationshipType RETURN count(relationshipType) as relationship_type_count }
+RETURN node_count, relationship_count, label_count, relationship_type_count
+"""
+
+def records_to_frame(records):
+    # Collects each column into one list so pandas builds typed columns in a
+    # single pass, rather than inferring types from a list of per-row dicts
+    columns = defaultdict(list)
+    for record in records:
+        for key, value in record.items():
+            columns[key].append(value)
+    return pd.DataFrame(columns)
 
 class Neo4jConnection:
-    def __init__(self, uri, user, password):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+    def __init__(self, uri, user, password, database="neo4j",
+                 max_connection_pool_size=MAX_CONNECTION_POOL_SIZE,
+                 connection_acquisition_timeout=CONNECTION_ACQUISITION_TIMEOUT):
+        self.driver = GraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=connection_acquisition_timeout
+        )
+        # Naming the database skips the home-database lookup round-trip per session
+        self.database = database
+        self._apoc_available = True
+        self._growth_snapshot = None
+        self._growth_thread = None
+        self._stop_refresh = threading.Event()
     
     def close(self):
+        self._stop_refresh.set()
         self.driver.close()
     
     def execute_query(self, query, parameters=None):
-        with self.driver.session() as session:
-            result = session.run(query, parameters or {})
-            return [record.data() for record in result]
+        # Driver-level execute_query reuses pooled connections and naming the
+        # database skips the round-trip that resolves the home database
+        records, _, _ = self.driver.execute_query(query, parameters or {}, database_=self.database)
+        return [record.data() for record in records]
     
-    def get_graph_statistics(self):
-        queries = {
-            "node_count": "MATCH (n) RETURN count(n) as count",
-            "relationship_count": "MATCH ()-[r]->() RETURN count(r) as count",
-            "label_count": "MATCH (n) RETURN count(DISTINCT labels(n)) as count",
-            "relationship_type_count": "MATCH ()-[r]->() RETURN count(DISTINCT type(r)) as count"
-        }
-        
-        stats = {}
-        for key, query in queries.items():
-            result = self.execute_query(query)
-            stats[key] = result[0]["count"] if result else 0
+    def iter_query(self, query, parameters=None):
+        # Yields records as the server streams them, fetch_size at a time,
+        # so callers like pandas can consume rows without a full list in memory
+        with self.driver.session(database=self.database, fetch_size=FETCH_SIZE) as session:
+            for record in session.run(query, parameters or {}):
+                yield record.data()
+    
+    def execute_queries(self, queries):
+        # Values are a query string or a (query, parameters) tuple. Every query
+        # gets its own session, so the round-trips overlap on the driver's pool.
+        if not queries:
+            return {}
         
-        return stats
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            futures = {
+                key: executor.submit(self.execute_query, *(query if isinstance(query, tuple) else (query,)))
+                for key, query in queries.items()
+            }
+            return {key: future.result() for key, future in futures.items()}
+    
+    def ensure_indexes(self):
+        for statement in INDEX_STATEMENTS:
+            try:
+                self.execute_query(statement)
+            except ClientError:
+                # Read-only users cannot create indexes; queries still work without them
+                pass
+    
+    def warm_query_plans(self, queries):
+        # EXPLAIN plans without executing, leaving the plan in Neo4j's query
+        # cache so the first real run skips parsing and planning
+        for query, params in queries:
+            try:
+                self.execute_query("EXPLAIN " + query, params)
+            except ClientError:
+                # e.g. an index hint whose index doesn't exist yet
+                pass
     
-    def get_recent_activity(self, limit=10):
+    def _query_with_apoc(self, apoc_query, fallback_query):
+        if self._apoc_available:
+            try:
+                return self.execute_query(apoc_query)
+            except ClientError as e:
+                # APOC not installed - remember so we don't pay for the failed call again.
+                # Other client errors (pool timeouts, auth) may pass, so only this call falls back
+                if e.code == "Neo.ClientError.Procedure.ProcedureNotFound":
+                    self._apoc_available = False
+        return self.execute_query(fallback_query)
+    
+    def get_graph_statistics(self):
+        result = self._query_with_apoc(APOC_STATISTICS_QUERY, GRAPH_STATISTICS_QUERY)
+        row = result[0] if result else {}
+        return {key: row.get(key) or 0 for key in STATISTICS_KEYS}
+    
+    def get_recent_activity(self, limit=10, cursor=None):
+        # Keyset pagination: cursor is the (created_at, element_id) of the last
+        # row already shown, so each page starts where the previous one ended.
+        # element_id breaks created_at ties, so rows sharing a timestamp across
+        # a page boundary aren't skipped. created_at comes back as an ISO string
+        # - it round-trips through datetime(), and st.cache_data can't unpickle
+        # neo4j temporal types. The first page takes any created_at value; older
+        # pages compare against a datetime, which skips string or date values
         query = """
         MATCH (n)
-        WHERE n.created_at IS NOT NULL
-        RETURN labels(n)[0] as type, n.name as name, n.created_at as created_at
-        ORDER BY n.created_at DESC
+        WITH n, elementId(n) as element_id
+        WHERE ($cursor IS NULL AND n.created_at IS NOT NULL)
+           OR n.created_at < datetime($cursor.created_at)
+           OR (n.created_at = datetime($cursor.created_at) AND element_id < $cursor.element_id)
+        RETURN labels(n)[0] as type, n.name as name, toString(n.created_at) as created_at, element_id
+        ORDER BY n.created_at DESC, element_id DESC
         LIMIT $limit
         """
         
-        results = self.execute_query(query, {"limit": limit})
-        if results:
-            return pd.DataFrame(results)
+        if cursor is not None:
+            created_at, element_id = cursor
+            cursor = {"created_at": created_at, "element_id": element_id}
+        df = records_to_frame(self.iter_query(query, {"limit": limit, "cursor": cursor}))
+        if not df.empty:
+            return df
         return None
     
     def check_health(self):
@@ -54,13 +209,14 @@ class Neo4jConnection:
             self.driver.verify_connectivity()
             health["Neo4j Connection"] = True
             
-            result = self.execute_query("RETURN 1 as test")
-            health["Database Access"] = result[0]["test"] == 1
-            
-            labels = self.execute_query("CALL db.labels()")
-            health["Schema Present"] = len(labels) > 0
+            results = self.execute_queries({
+                "access": "RETURN 1 as test",
+                "labels": "CALL db.labels()"
+            })
+            health["Database Access"] = results["access"][0]["test"] == 1
+            health["Schema Present"] = len(results["labels"]) > 0
             
-        except Exception:
+        except (ServiceUnavailable, ClientError):
             pass
         
         return health
@@ -69,59 +225,61 @@ class Neo4jConnection:
         metrics = {}
         
         try:
-            degree_query = """
-            MATCH (n)
-            RETURN avg(size((n)-->())) as avg_out_degree,
-                   avg(size((n)<--())) as avg_in_degree
-            """
-            result = self.execute_query(degree_query)
-            if result:
-                metrics["avg_degree"] = (result[0]["avg_out_degree"] or 0) + (result[0]["avg_in_degree"] or 0)
+            # Both metrics follow from the node/relationship counts, which the
+            # statistics query reads from the count store instead of scanning
+            stats = self.get_graph_statistics()
+            node_count = stats["node_count"]
+            edge_count = stats["relationship_count"]
             
-            density_query = """
-            MATCH (n)
-            WITH count(n) as node_count
-            MATCH ()-[r]->()
-            WITH count(r) as edge_count, node_count
-            RETURN toFloat(edge_count) / (node_count * (node_count - 1)) as density
-            """
-            result = self.execute_query(density_query)
-            if result:
-                metrics["density"] = result[0]["density"] or 0
+            # Each relationship contributes one out-degree and one in-degree
+            metrics["avg_degree"] = 2 * edge_count / node_count if node_count else 0.0
+            metrics["density"] = edge_count / (node_count * (node_count - 1)) if node_count > 1 else 0.0
             
             metrics["clustering"] = 0.0
             metrics["components"] = 1
             
-        except Exception:
+        except (ServiceUnavailable, ClientError):
             pass
         
         return metrics
     
-    def get_growth_data(self):
-        query = """
-        MATCH (n)
-        WHERE n.created_at IS NOT NULL
-        WITH date(n.created_at) as day, count(n) as count
-        ORDER BY day
-        RETURN day, sum(count) OVER (ORDER BY day) as cumulative_count
-        """
+    def start_growth_refresh(self, interval=GROWTH_REFRESH_INTERVAL):
+        # One daemon thread per connection recomputes the snapshot every
+        # interval seconds, starting immediately
+        if self._growth_thread is None:
+            self._growth_thread = threading.Thread(
+                target=self._growth_refresh_loop, args=(interval,),
+                name="growth-refresh", daemon=True
+            )
+            self._growth_thread.start()
+    
+    def _growth_refresh_loop(self, interval):
+        while True:
+            self.refresh_growth_snapshot()
+            if self._stop_refresh.wait(interval):
+                return
+    
+    def refresh_growth_snapshot(self):
+        try:
+            df = records_to_frame(self.iter_query(GROWTH_QUERY))
+        except (DriverError, Neo4jError):
+            # Keep serving the previous snapshot until the next attempt
+            return False
         
-        results = self.execute_query(query)
-        if results:
-            df = pd.DataFrame(results)
+        if not df.empty:
             df['day'] = pd.to_datetime(df['day'])
-            return df.set_index('day')
-        return pd.DataFrame()
+            df['cumulative_count'] = df['count'].cumsum()
+            df = df.set_index('day')[['cumulative_count']]
+        self._growth_snapshot = df
+        return True
+    
+    def get_growth_data(self):
+        # None until the first background refresh has finished
+        return self._growth_snapshot
     
     def get_usage_patterns(self):
-        query = """
-        MATCH (n)
-        RETURN labels(n)[0] as type, count(*) as count
-        ORDER BY count DESC
-        """
-        
-        results = self.execute_query(query)
+        results = self._query_with_apoc(APOC_USAGE_QUERY, USAGE_QUERY)
         if results:
             df = pd.DataFrame(results)
             return df.set_index('type')['count']
-        return None
\ No newline at end of file
+        return None
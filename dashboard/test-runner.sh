@@ -175,7 +175,7 @@ install_dependencies() {
         # Check if we're in a virtual environment
         if [[ "$VIRTUAL_ENV" != "" ]]; then
             log_info "Installing in virtual environment: $VIRTUAL_ENV"
-            pip install -r requirements.txt
+            pip install -r requirements-dev.txt
         else
             # Try to create and use a virtual environment
             if [ ! -d "venv" ]; then
@@ -185,7 +185,7 @@ install_dependencies() {
             
             log_info "Activating virtual environment..."
             source venv/bin/activate
-            pip install -r requirements.txt
+            pip install -r requirements-dev.txt
             log_info "Virtual environment created at: $DASHBOARD_DIR/venv"
             log_info "To activate manually: source $DASHBOARD_DIR/venv/bin/activate"
         fi
@@ -365,7 +365,9 @@ run_dashboard() {
     export NEO4J_PASSWORD=${NEO4J_PASSWORD:-"password"}
     export CONDUIT_URL=${CONDUIT_URL:-"http://localhost:3001"}
     
-    streamlit run app.py --server.port "$port" --server.headless true
+    # Compress websocket frames - figure and graph payloads are large, repetitive JSON
+    streamlit run app.py --server.port "$port" --server.headless true \
+        --server.enableWebsocketCompression true
 }
 
 # Cleanup function
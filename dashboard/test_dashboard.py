@@ -2,308 +2,135 @@
 """
 Comprehensive test suite for Streamlit Knowledge Graph Dashboard
 Following FLOW methodology with automated and manual verification
+
+While fixing a failure, `python test_dashboard.py --lf` reruns only the tests
+that failed last time (or everything, if none did), failed tests first.
 """
 
 import unittest
+import importlib.util
+import pytest
 import sys
 import os
-import tempfile
-import json
-from unittest.mock import Mock, patch, MagicMock
-import pandas as pd
-
-# Add dashboard directory to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-# Import dashboard components
-try:
-    from neo4j_connection import Neo4jConnection
-    from claude_conduit import ClaudeConduitClient
-    from visualizations import GraphVisualizer
-    import app
-except ImportError as e:
-    print(f"Warning: Could not import dashboard modules: {e}")
-    print("Make sure all dependencies are installed: pip install -r requirements.txt")
+from unittest.mock import patch
 
+# Connection, client and visualizer tests live under tests/unit and
+# tests/integration; this file keeps the app-level checks and the runner
+DASHBOARD_DIR = os.path.dirname(os.path.abspath(__file__))
+TESTS_DIR = os.path.join(DASHBOARD_DIR, "tests")
 
-class TestNeo4jConnection(unittest.TestCase):
-    """Test Neo4j connection handling"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.mock_driver = Mock()
-        self.mock_session = Mock()
-        # Properly mock context manager for Neo4j session
-        self.mock_driver.session.return_value = MagicMock()
-        self.mock_driver.session.return_value.__enter__ = Mock(return_value=self.mock_session)
-        self.mock_driver.session.return_value.__exit__ = Mock(return_value=None)
-        
-    @patch('neo4j_connection.GraphDatabase.driver')
-    def test_connection_initialization(self, mock_driver):
-        """Test Neo4j connection initialization"""
-        mock_driver.return_value = self.mock_driver
-        
-        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
-        
-        mock_driver.assert_called_once_with("bolt://localhost:7687", auth=("neo4j", "password"))
-        self.assertIsNotNone(conn)
-    
-    @patch('neo4j_connection.GraphDatabase.driver')
-    def test_execute_query(self, mock_driver):
-        """Test query execution"""
-        mock_driver.return_value = self.mock_driver
-        
-        # Mock query result - return list of records, each with .data() method
-        mock_record = Mock()
-        mock_record.data.return_value = {"count": 42}
-        self.mock_session.run.return_value = [mock_record]
-        
-        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
-        result = conn.execute_query("MATCH (n) RETURN count(n) as count")
-        
-        self.assertEqual(result, [{"count": 42}])
-        self.mock_session.run.assert_called_once()
-    
-    @patch('neo4j_connection.GraphDatabase.driver')
-    def test_graph_statistics(self, mock_driver):
-        """Test graph statistics calculation"""
-        mock_driver.return_value = self.mock_driver
-        
-        # Mock statistics results
-        def mock_execute_query(query, params=None):
-            if "count(n)" in query:
-                return [{"count": 100}]
-            elif "count(r)" in query:
-                return [{"count": 50}]
-            elif "DISTINCT labels" in query:
-                return [{"count": 5}]
-            elif "DISTINCT type" in query:
-                return [{"count": 3}]
-            return [{"count": 0}]
-        
-        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
-        conn.execute_query = mock_execute_query
-        
-        stats = conn.get_graph_statistics()
-        
-        expected_stats = {
-            "node_count": 100,
-            "relationship_count": 50,
-            "label_count": 5,
-            "relationship_type_count": 3
-        }
-        self.assertEqual(stats, expected_stats)
-
-
-class TestClaudeConduitClient(unittest.TestCase):
-    """Test Claude Conduit HTTP client"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.client = ClaudeConduitClient("http://localhost:3001")
-        self.mock_response = Mock()
-    
-    @patch('claude_conduit.requests.Session.get')
-    def test_health_check_success(self, mock_get):
-        """Test successful health check"""
-        self.mock_response.json.return_value = {"status": "healthy", "version": "2.0.0"}
-        self.mock_response.raise_for_status.return_value = None
-        mock_get.return_value = self.mock_response
-        
-        result = self.client.health_check()
-        
-        self.assertEqual(result["status"], "healthy")
-        self.assertEqual(result["version"], "2.0.0")
-        mock_get.assert_called_once_with("http://localhost:3001/health")
-    
-    @patch('claude_conduit.requests.Session.get')
-    def test_health_check_failure(self, mock_get):
-        """Test health check failure handling"""
-        import requests
-        mock_get.side_effect = requests.exceptions.ConnectionError("Connection refused")
-        
-        result = self.client.health_check()
-        
-        self.assertEqual(result["status"], "unhealthy")
-        self.assertIn("error", result)
-    
-    @patch('claude_conduit.requests.Session.get')
-    def test_get_available_tools(self, mock_get):
-        """Test fetching available tools"""
-        mock_tools = {
-            "mcp": {"servers": {"taskmaster-ai": {"tools": ["plan_task"]}}},
-            "plugins": [{"name": "test-plugin"}]
-        }
-        self.mock_response.json.return_value = mock_tools
-        self.mock_response.raise_for_status.return_value = None
-        mock_get.return_value = self.mock_response
-        
-        result = self.client.get_available_tools()
-        
-        self.assertEqual(result, mock_tools)
-        mock_get.assert_called_once_with("http://localhost:3001/tools")
-    
-    @patch('claude_conduit.requests.Session.post')
-    def test_execute_tool(self, mock_post):
-        """Test tool execution"""
-        mock_result = {"status": "success", "result": {"plan": "test plan"}}
-        self.mock_response.json.return_value = mock_result
-        self.mock_response.raise_for_status.return_value = None
-        mock_post.return_value = self.mock_response
-        
-        result = self.client.execute_tool("taskmaster-ai", "plan_task", {"task": "test"})
-        
-        self.assertEqual(result, mock_result)
-        mock_post.assert_called_once_with(
-            "http://localhost:3001/execute/taskmaster-ai/plan_task",
-            json={"task": "test"}
-        )
-
-
-class TestGraphVisualizer(unittest.TestCase):
-    """Test graph visualization components"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        self.mock_neo4j = Mock()
-        self.visualizer = GraphVisualizer(self.mock_neo4j)
-    
-    def test_get_node_types(self):
-        """Test getting node types from database"""
-        self.mock_neo4j.execute_query.return_value = [
-            {"type": "PullRequest"},
-            {"type": "Agent"},
-            {"type": "Task"}
-        ]
-        
-        types = self.visualizer.get_node_types()
-        
-        self.assertEqual(types, ["PullRequest", "Agent", "Task"])
-        self.mock_neo4j.execute_query.assert_called_once()
-    
-    def test_get_relationship_types(self):
-        """Test getting relationship types from database"""
-        self.mock_neo4j.execute_query.return_value = [
-            {"type": "IMPLEMENTS"},
-            {"type": "DEPENDS_ON"},
-            {"type": "ASSIGNED_TO"}
-        ]
-        
-        types = self.visualizer.get_relationship_types()
-        
-        self.assertEqual(types, ["IMPLEMENTS", "DEPENDS_ON", "ASSIGNED_TO"])
-    
-    def test_color_mapping(self):
-        """Test node color mapping"""
-        self.assertIn("PullRequest", self.visualizer.color_map)
-        self.assertIn("Agent", self.visualizer.color_map)
-        self.assertIn("Task", self.visualizer.color_map)
-    
-    def test_pr_workflow_data(self):
-        """Test PR workflow data processing"""
-        mock_data = [
-            {"PR": "PR-001", "Action": "IMPLEMENTS", "Target": "Task", "Count": 1},
-            {"PR": "PR-002", "Action": "DEPENDS_ON", "Target": "PR", "Count": 1}
-        ]
-        self.mock_neo4j.execute_query.return_value = mock_data
-        
-        result = self.visualizer.get_pr_workflow()
-        
-        self.assertIsInstance(result, pd.DataFrame)
-        if not result.empty:
-            self.assertEqual(len(result), 2)
+# Skip rather than fail later with NameError when dependencies are missing
+# (pip install -r requirements.txt)
+app = pytest.importorskip("app")
 
 
 class TestStreamlitApp(unittest.TestCase):
     """Test Streamlit app functions"""
     
+    def setUp(self):
+        """Clear cached resources so each test builds its own connections"""
+        app.get_neo4j_connection.clear()
+        app.get_conduit_client.clear()
+    
+    @patch.dict(os.environ, {
+        'NEO4J_URI': 'bolt://localhost:7687',
+        'NEO4J_USER': 'neo4j',
+        'NEO4J_PASSWORD': 'password',
+        'CONDUIT_URL': 'http://localhost:3001'
+    })
     @patch('app.Neo4jConnection')
     @patch('app.ClaudeConduitClient')
     def test_connection_initialization(self, mock_conduit, mock_neo4j):
         """Test connection initialization functions"""
-        # Test cached connection functions
-        with patch.dict(os.environ, {
-            'NEO4J_URI': 'bolt://localhost:7687',
-            'NEO4J_USER': 'neo4j',
-            'NEO4J_PASSWORD': 'password',
-            'CONDUIT_URL': 'http://localhost:3001'
-        }):
-            # These would normally be cached by Streamlit
-            neo4j_conn = app.get_neo4j_connection()
-            conduit_client = app.get_conduit_client()
+        # Cached by st.cache_resource when running under Streamlit; bare
+        # pytest has no runtime, so only one construction per call is checked
+        neo4j_conn = app.get_neo4j_connection()
+        conduit_client = app.get_conduit_client()
+        
+        mock_neo4j.assert_called_once()
+        mock_conduit.assert_called_once()
+        self.assertEqual(mock_neo4j.call_args[1]["max_connection_pool_size"], 10)
+        self.assertEqual(mock_neo4j.call_args[1]["connection_acquisition_timeout"], 2)
+
+    def test_row_limit_only_after_final_return(self):
+        """Test custom queries get a LIMIT only where Cypher allows one"""
+        capped = f" LIMIT {app.QUERY_ROW_LIMIT}"
+        
+        self.assertEqual(app.with_row_limit("MATCH (n) RETURN n;"), "MATCH (n) RETURN n" + capped)
+        self.assertEqual(app.with_row_limit("MATCH (n) RETURN n // all nodes"), "MATCH (n) RETURN n" + capped)
+        self.assertEqual(app.with_row_limit("MATCH (n) WITH n LIMIT 5 RETURN n"),
+                         "MATCH (n) WITH n LIMIT 5 RETURN n" + capped)
+        self.assertEqual(app.with_row_limit("MATCH (n) RETURN n LIMIT 5"), "MATCH (n) RETURN n LIMIT 5")
+        self.assertEqual(app.with_row_limit("CALL { MATCH (n) RETURN n } SET n.seen = true"),
+                         "CALL { MATCH (n) RETURN n } SET n.seen = true")
+        self.assertEqual(app.with_row_limit("MATCH (n) WHERE n.name = 'x // RETURN' RETURN n"),
+                         "MATCH (n) WHERE n.name = 'x // RETURN' RETURN n" + capped)
+
+    def test_overview_survives_rerun(self):
+        """Test cached Overview data loads again on the next rerun"""
+        import streamlit as st
+        from streamlit.testing.v1 import AppTest
+        from neo4j.time import DateTime
+        from neo4j_connection import Neo4jConnection
+        
+        st.cache_data.clear()
+        created_at = DateTime(2024, 1, 2, 3, 4, 5)
+        
+        def execute_query(conn, query, parameters=None):
+            return [{"test": 1}]
+        
+        def iter_query(conn, query, parameters=None):
+            # Stands in for the driver: temporal columns come back as neo4j types
+            if "n.name as name" in query:
+                value = created_at.iso_format() if "toString(n.created_at)" in query else created_at
+                yield {"type": "PullRequest", "name": "PR one", "created_at": value,
+                       "element_id": "4:x:1"}
+        
+        with patch("neo4j_connection.GraphDatabase.driver"), \
+                patch.object(Neo4jConnection, "execute_query", execute_query), \
+                patch.object(Neo4jConnection, "iter_query", iter_query), \
+                patch("claude_conduit.ClaudeConduitClient.health_check", return_value={}), \
+                patch("claude_conduit.ClaudeConduitClient.get_fortune", return_value="Fortune service unavailable"):
+            at = AppTest.from_file(os.path.join(DASHBOARD_DIR, "app.py"), default_timeout=30)
+            at.run()
+            at.run()
+        
+        self.assertEqual(list(at.exception), [])
+        self.assertEqual(len(at.dataframe), 1)
+
+    def test_activity_newest_after_empty_older_page(self):
+        """Test the Newest button stays when an Older page comes back empty"""
+        from streamlit.testing.v1 import AppTest
+        from neo4j_connection import Neo4jConnection
+        
+        def execute_query(conn, query, parameters=None):
+            return [{"test": 1}]
+        
+        def iter_query(conn, query, parameters=None):
+            # Exactly one full page of activity, so Older leads to nothing
+            if "n.name as name" in query and parameters["cursor"] is None:
+                for i in range(10):
+                    yield {"type": "PullRequest", "name": f"PR {i}",
+                           "created_at": f"2024-01-{10 - i:02d}T00:00:00Z", "element_id": f"4:x:{i}"}
+        
+        with patch("neo4j_connection.GraphDatabase.driver"), \
+                patch.object(Neo4jConnection, "execute_query", execute_query), \
+                patch.object(Neo4jConnection, "iter_query", iter_query), \
+                patch("claude_conduit.ClaudeConduitClient.health_check", return_value={}), \
+                patch("claude_conduit.ClaudeConduitClient.get_fortune", return_value="Fortune service unavailable"):
+            at = AppTest.from_file(os.path.join(DASHBOARD_DIR, "app.py"), default_timeout=30)
+            at.run()
+            # The handlers end in st.rerun, so each click settles on a second run
+            next(button for button in at.button if button.label == "Older ▶").click().run()
+            at.run()
             
-            mock_neo4j.assert_called()
-            mock_conduit.assert_called()
-
-
-class TestIntegration(unittest.TestCase):
-    """Integration tests requiring actual services"""
-    
-    def setUp(self):
-        """Set up for integration tests"""
-        self.neo4j_available = self._check_neo4j()
-        self.conduit_available = self._check_conduit()
-    
-    def _check_neo4j(self):
-        """Check if Neo4j is available"""
-        try:
-            from neo4j import GraphDatabase
-            driver = GraphDatabase.driver(
-                "bolt://localhost:7687",
-                auth=("neo4j", "password")
-            )
-            driver.verify_connectivity()
-            driver.close()
-            return True
-        except:
-            return False
-    
-    def _check_conduit(self):
-        """Check if claude-conduit is available"""
-        try:
-            import requests
-            response = requests.get("http://localhost:3001/health", timeout=5)
-            return response.status_code == 200
-        except:
-            return False
-    
-    @unittest.skipUnless(os.getenv('RUN_INTEGRATION_TESTS'), "Integration tests disabled")
-    def test_end_to_end_neo4j(self):
-        """End-to-end test with real Neo4j"""
-        if not self.neo4j_available:
-            self.skipTest("Neo4j not available")
-        
-        conn = Neo4jConnection(
-            "bolt://localhost:7687",
-            "neo4j", 
-            "password"
-        )
-        
-        # Test basic connectivity
-        result = conn.execute_query("RETURN 1 as test")
-        self.assertEqual(result[0]["test"], 1)
-        
-        # Test statistics
-        stats = conn.get_graph_statistics()
-        self.assertIsInstance(stats, dict)
-        self.assertIn("node_count", stats)
-    
-    @unittest.skipUnless(os.getenv('RUN_INTEGRATION_TESTS'), "Integration tests disabled")
-    def test_end_to_end_conduit(self):
-        """End-to-end test with real claude-conduit"""
-        if not self.conduit_available:
-            self.skipTest("claude-conduit not available")
-        
-        client = ClaudeConduitClient("http://localhost:3001")
-        
-        # Test health check
-        health = client.health_check()
-        self.assertEqual(health["status"], "healthy")
+            self.assertEqual(list(at.exception), [])
+            self.assertIn("⏮ Newest", [button.label for button in at.button])
+            next(button for button in at.button if button.label == "⏮ Newest").click().run()
+            at.run()
         
-        # Test fortune
-        fortune = client.get_fortune()
-        self.assertIsInstance(fortune, str)
-        self.assertNotEqual(fortune, "Fortune service unavailable")
+        self.assertEqual(len(at.dataframe), 1)
+
 
 
 def run_manual_verification():
@@ -350,6 +177,8 @@ if __name__ == "__main__":
                        help="Show manual verification checklist")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Verbose output")
+    parser.add_argument("--lf", action="store_true",
+                       help="Rerun only last run's failures, failed tests first")
     
     args = parser.parse_args()
     
@@ -361,38 +190,16 @@ if __name__ == "__main__":
     if args.integration:
         os.environ['RUN_INTEGRATION_TESTS'] = '1'
     
-    # Configure test verbosity
-    verbosity = 2 if args.verbose else 1
-    
-    # Run unit tests
-    print("Running Dashboard Test Suite...")
-    print("="*50)
-    
-    # Discover and run tests
-    loader = unittest.TestLoader()
-    suite = loader.loadTestsFromModule(sys.modules[__name__])
-    
-    runner = unittest.TextTestRunner(verbosity=verbosity, buffer=True)
-    result = runner.run(suite)
-    
-    # Print summary
-    print("\n" + "="*50)
-    print("TEST SUMMARY")
-    print("="*50)
-    print(f"Tests run: {result.testsRun}")
-    print(f"Failures: {len(result.failures)}")
-    print(f"Errors: {len(result.errors)}")
-    print(f"Skipped: {len(result.skipped)}")
-    
-    if result.failures:
-        print("\nFAILURES:")
-        for test, traceback in result.failures:
-            print(f"  - {test}: {traceback.split(chr(10))[-2]}")
-    
-    if result.errors:
-        print("\nERRORS:")
-        for test, traceback in result.errors:
-            print(f"  - {test}: {traceback.split(chr(10))[-2]}")
-    
-    # Exit with appropriate code
-    sys.exit(0 if result.wasSuccessful() else 1)
\ No newline at end of file
+    # The test classes share no state, so each file runs in its own xdist
+    # worker; without pytest-xdist (requirements-dev.txt) they run serially
+    pytest_args = [__file__, TESTS_DIR]
+    if importlib.util.find_spec("xdist") is not None:
+        pytest_args += ["-n", "auto", "--dist=loadfile"]
+    if not args.integration:
+        pytest_args += ["-m", "not integration"]
+    if args.verbose:
+        pytest_args.append("-v")
+    if args.lf:
+        pytest_args += ["--lf", "--ff"]
+    
+    sys.exit(pytest.main(pytest_args))
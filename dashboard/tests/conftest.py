@@ -0,0 +1,29 @@
+"""
+Shared pytest configuration for the dashboard test suites
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+# Make the dashboard modules importable once, instead of every test file
+# pushing its own (duplicate) entry onto sys.path
+DASHBOARD_DIR = str(Path(__file__).resolve().parent.parent)
+if DASHBOARD_DIR not in sys.path:
+    sys.path.insert(0, DASHBOARD_DIR)
+
+
+@pytest.fixture
+def http_response():
+    """Factory for canned requests.Response stubs"""
+    def _make(payload, status_code=200):
+        # spec= keeps attribute typos from silently returning child mocks
+        response = Mock(spec=requests.Response)
+        response.json.return_value = payload
+        response.raise_for_status.return_value = None
+        response.status_code = status_code
+        return response
+    return _make
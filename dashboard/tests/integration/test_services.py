@@ -4,89 +4,99 @@ Integration tests for external services
 Tests real connectivity to Neo4j and claude-conduit services
 """
 
-import unittest
-import sys
+import pytest
 import os
+import atexit
+import functools
+import requests
+from requests.adapters import HTTPAdapter
 
-# Add dashboard directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+Neo4jConnection = pytest.importorskip("neo4j_connection").Neo4jConnection
+ClaudeConduitClient = pytest.importorskip("claude_conduit").ClaudeConduitClient
 
-try:
-    from neo4j_connection import Neo4jConnection
-    from claude_conduit import ClaudeConduitClient
-except ImportError as e:
-    print(f"Warning: Could not import dashboard modules: {e}")
 
+# Applied to every test before fixtures run, so with integration tests
+# disabled the service probes never fire
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not os.getenv('RUN_INTEGRATION_TESTS'), reason="Integration tests disabled")
+]
 
-class TestServiceIntegration(unittest.TestCase):
-    """Integration tests requiring actual services"""
+
+# Pooled session so repeated conduit probes reuse one keep-alive connection
+_CONDUIT_SESSION = requests.Session()
+_CONDUIT_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+atexit.register(_CONDUIT_SESSION.close)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_shared_neo4j_driver():
+    """Build the probe driver once; the session fixture and any reruns reuse its pool"""
+    from neo4j import GraphDatabase
+    driver = GraphDatabase.driver(
+        "bolt://localhost:7687",
+        auth=("neo4j", "password"),
+        max_connection_pool_size=10,
+        connection_acquisition_timeout=5
+    )
+    atexit.register(driver.close)
+    return driver
+
+
+@pytest.fixture(scope="session")
+def neo4j_available():
+    """Check once per session if Neo4j is available"""
+    try:
+        _get_shared_neo4j_driver().verify_connectivity()
+        return True
+    except Exception:
+        return False
+
+
+@pytest.fixture(scope="session")
+def conduit_available():
+    """Check once per session if claude-conduit is available"""
+    try:
+        # Loopback probe; a healthy conduit answers well inside a second
+        response = _CONDUIT_SESSION.get("http://localhost:3001/health", timeout=1)
+        return response.status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+
+def test_end_to_end_neo4j(neo4j_available):
+    """End-to-end test with real Neo4j"""
+    if not neo4j_available:
+        pytest.skip("Neo4j not available")
     
-    def setUp(self):
-        """Set up for integration tests"""
-        self.neo4j_available = self._check_neo4j()
-        self.conduit_available = self._check_conduit()
+    conn = Neo4jConnection(
+        "bolt://localhost:7687",
+        "neo4j", 
+        "password"
+    )
     
-    def _check_neo4j(self):
-        """Check if Neo4j is available"""
-        try:
-            from neo4j import GraphDatabase
-            driver = GraphDatabase.driver(
-                "bolt://localhost:7687",
-                auth=("neo4j", "password")
-            )
-            driver.verify_connectivity()
-            driver.close()
-            return True
-        except:
-            return False
+    # Test basic connectivity
+    result = conn.execute_query("RETURN 1 as test")
+    assert result[0]["test"] == 1
+    
+    # Test statistics
+    stats = conn.get_graph_statistics()
+    assert isinstance(stats, dict)
+    assert "node_count" in stats
+
+
+def test_end_to_end_conduit(conduit_available):
+    """End-to-end test with real claude-conduit"""
+    if not conduit_available:
+        pytest.skip("claude-conduit not available")
     
-    def _check_conduit(self):
-        """Check if claude-conduit is available"""
-        try:
-            import requests
-            response = requests.get("http://localhost:3001/health", timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+    client = ClaudeConduitClient("http://localhost:3001")
     
-    @unittest.skipUnless(os.getenv('RUN_INTEGRATION_TESTS'), "Integration tests disabled")
-    def test_end_to_end_neo4j(self):
-        """End-to-end test with real Neo4j"""
-        if not self.neo4j_available:
-            self.skipTest("Neo4j not available")
-        
-        conn = Neo4jConnection(
-            "bolt://localhost:7687",
-            "neo4j", 
-            "password"
-        )
-        
-        # Test basic connectivity
-        result = conn.execute_query("RETURN 1 as test")
-        self.assertEqual(result[0]["test"], 1)
-        
-        # Test statistics
-        stats = conn.get_graph_statistics()
-        self.assertIsInstance(stats, dict)
-        self.assertIn("node_count", stats)
+    # Test health check
+    health = client.health_check()
+    assert health["status"] == "healthy"
     
-    @unittest.skipUnless(os.getenv('RUN_INTEGRATION_TESTS'), "Integration tests disabled")
-    def test_end_to_end_conduit(self):
-        """End-to-end test with real claude-conduit"""
-        if not self.conduit_available:
-            self.skipTest("claude-conduit not available")
-        
-        client = ClaudeConduitClient("http://localhost:3001")
-        
-        # Test health check
-        health = client.health_check()
-        self.assertEqual(health["status"], "healthy")
-        
-        # Test fortune
-        fortune = client.get_fortune()
-        self.assertIsInstance(fortune, str)
-        self.assertNotEqual(fortune, "Fortune service unavailable")
-
-
-if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    # Test fortune
+    fortune = client.get_fortune()
+    assert isinstance(fortune, str)
+    assert fortune != "Fortune service unavailable"
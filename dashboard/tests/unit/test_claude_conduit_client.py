@@ -5,83 +5,167 @@ Tests API integration with mocked HTTP responses
 """
 
 import unittest
-import sys
-import os
-from unittest.mock import Mock, patch
+import pytest
+import json
+import gzip
+from types import MappingProxyType
+from unittest.mock import patch, DEFAULT
 
-# Add dashboard directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+claude_conduit = pytest.importorskip("claude_conduit")
+ClaudeConduitClient = claude_conduit.ClaudeConduitClient
 
-try:
-    from claude_conduit import ClaudeConduitClient
-except ImportError as e:
-    print(f"Warning: Could not import claude_conduit: {e}")
+# Canned conduit responses, built once and read-only so no test can alter
+# what the next one sees
+_HEALTHY_RESP = MappingProxyType({"status": "healthy", "version": "2.0.0"})
+_MOCK_TOOLS = MappingProxyType({
+    "mcp": {"servers": {"taskmaster-ai": {"tools": ["plan_task"]}}},
+    "plugins": [{"name": "test-plugin"}]
+})
+_EXEC_RESULT = MappingProxyType({"status": "success", "result": {"plan": "test plan"}})
 
 
 class TestClaudeConduitClient(unittest.TestCase):
     """Test Claude Conduit HTTP client"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Set up the client shared by every test"""
+        # One client (and Session) per class; tests stub Session methods at the
+        # class level, so the shared instance is still intercepted
+        cls.client = ClaudeConduitClient("http://localhost:3001")
+    
+    @pytest.fixture(autouse=True)
+    def _use_http_response(self, http_response):
+        """Expose the conftest response factory to unittest-style tests"""
+        self.http_response = http_response
+    
     def setUp(self):
         """Set up test fixtures"""
-        self.client = ClaudeConduitClient("http://localhost:3001")
-        self.mock_response = Mock()
+        # Both Session methods patched through one patcher that resolves the path once
+        patcher = patch.multiple('claude_conduit.requests.Session', get=DEFAULT, post=DEFAULT)
+        mocks = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_get = mocks["get"]
+        self.mock_post = mocks["post"]
     
-    @patch('claude_conduit.requests.Session.get')
-    def test_health_check_success(self, mock_get):
+    def test_health_check_success(self):
         """Test successful health check"""
-        self.mock_response.json.return_value = {"status": "healthy", "version": "2.0.0"}
-        self.mock_response.raise_for_status.return_value = None
-        mock_get.return_value = self.mock_response
+        self.mock_get.return_value = self.http_response(_HEALTHY_RESP)
         
         result = self.client.health_check()
         
         self.assertEqual(result["status"], "healthy")
         self.assertEqual(result["version"], "2.0.0")
-        mock_get.assert_called_once_with("http://localhost:3001/health")
+        self.mock_get.assert_called_once_with("http://localhost:3001/health", timeout=5)
     
-    @patch('claude_conduit.requests.Session.get')
-    def test_health_check_failure(self, mock_get):
+    def test_health_check_failure(self):
         """Test health check failure handling"""
         import requests
-        mock_get.side_effect = requests.exceptions.ConnectionError("Connection refused")
+        self.mock_get.side_effect = requests.exceptions.ConnectionError("Connection refused")
         
         result = self.client.health_check()
         
         self.assertEqual(result["status"], "unhealthy")
         self.assertIn("error", result)
     
-    @patch('claude_conduit.requests.Session.get')
-    def test_get_available_tools(self, mock_get):
+    def test_get_available_tools(self):
         """Test fetching available tools"""
-        mock_tools = {
-            "mcp": {"servers": {"taskmaster-ai": {"tools": ["plan_task"]}}},
-            "plugins": [{"name": "test-plugin"}]
-        }
-        self.mock_response.json.return_value = mock_tools
-        self.mock_response.raise_for_status.return_value = None
-        mock_get.return_value = self.mock_response
+        self.mock_get.return_value = self.http_response(_MOCK_TOOLS)
         
         result = self.client.get_available_tools()
         
-        self.assertEqual(result, mock_tools)
-        mock_get.assert_called_once_with("http://localhost:3001/tools")
+        self.assertEqual(result, _MOCK_TOOLS)
+        self.mock_get.assert_called_once_with("http://localhost:3001/tools", timeout=5)
     
-    @patch('claude_conduit.requests.Session.post')
-    def test_execute_tool(self, mock_post):
+    def test_execute_tool(self):
         """Test tool execution"""
-        mock_result = {"status": "success", "result": {"plan": "test plan"}}
-        self.mock_response.json.return_value = mock_result
-        self.mock_response.raise_for_status.return_value = None
-        mock_post.return_value = self.mock_response
+        self.mock_post.return_value = self.http_response(_EXEC_RESULT)
         
         result = self.client.execute_tool("taskmaster-ai", "plan_task", {"task": "test"})
         
-        self.assertEqual(result, mock_result)
-        mock_post.assert_called_once_with(
+        self.assertEqual(result, _EXEC_RESULT)
+        self.mock_post.assert_called_once_with(
             "http://localhost:3001/execute/taskmaster-ai/plan_task",
-            json={"task": "test"}
+            data=b'{"task": "test"}',
+            headers={"Content-Type": "application/json"},
+            timeout=60
         )
-
-
-if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    
+    def test_execute_tool_gzips_large_payloads(self):
+        """Test payloads over the threshold are sent gzip-encoded"""
+        self.mock_post.return_value = self.http_response({"status": "success"})
+        payload = {"key": "dashboard/plan", "value": "x" * 4096}
+        
+        self.client.execute_tool("cloud-memory", "store", payload)
+        
+        kwargs = self.mock_post.call_args[1]
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "gzip")
+        self.assertLess(len(kwargs["data"]), 1024)
+        self.assertEqual(json.loads(gzip.decompress(kwargs["data"])), payload)
+    
+    def test_execute_tools_keeps_call_order(self):
+        """Test concurrent tool execution returns results in call order"""
+        # Patched on the instance for this test only, since the client is shared
+        patcher = patch.object(self.client, "execute_tool",
+                               side_effect=lambda server, tool, payload: {"tool": tool, **payload})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        results = self.client.execute_tools([
+            ("cloud-memory", "store", {"key": "a"}),
+            ("scout", "research", {"topic": "b"})
+        ])
+        
+        self.assertEqual(results, [
+            {"tool": "store", "key": "a"},
+            {"tool": "research", "topic": "b"}
+        ])
+        self.assertEqual(self.client.execute_tools([]), [])
+    
+    def test_execute_tools_batch(self):
+        """Test batched tool execution sends a single request"""
+        results = [{"status": "success", "tool": "store"}, {"status": "success", "tool": "research"}]
+        self.mock_post.return_value = self.http_response({"status": "success", "results": results})
+        
+        batch = self.client.execute_tools_batch([
+            ("cloud-memory", "store", {"key": "a"}),
+            ("scout", "research", {"topic": "b"})
+        ])
+        
+        self.assertEqual(batch, results)
+        self.mock_post.assert_called_once()
+        self.assertEqual(self.mock_post.call_args[0][0], "http://localhost:3001/execute-batch")
+        self.assertEqual(json.loads(self.mock_post.call_args[1]["data"]), [
+            {"server": "cloud-memory", "tool": "store", "payload": {"key": "a"}},
+            {"server": "scout", "tool": "research", "payload": {"topic": "b"}}
+        ])
+    
+    def test_execute_tools_batch_short_response_fails(self):
+        """Test a batch answering fewer results than calls reports every call failed"""
+        self.mock_post.return_value = self.http_response({"status": "success", "results": [{"status": "success"}]})
+        
+        batch = self.client.execute_tools_batch([
+            ("cloud-memory", "store", {"key": "a"}),
+            ("cloud-memory", "store", {"key": "b"})
+        ])
+        
+        self.assertEqual([result["status"] for result in batch], ["failed", "failed"])
+    
+    def test_execute_tools_batch_falls_back(self):
+        """Test conduits without the batch endpoint get individual calls"""
+        self.mock_post.return_value = self.http_response({}, status_code=404)
+        patcher = patch.object(self.client, "execute_tools", return_value=[{"status": "success"}])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        calls = [("cloud-memory", "store", {"key": "a"})]
+        self.assertEqual(self.client.execute_tools_batch(calls), [{"status": "success"}])
+        self.client.execute_tools.assert_called_once_with(calls)
+    
+    def test_session_uses_pooled_retrying_adapter(self):
+        """Test the session mounts a keep-alive pool with retries"""
+        adapter = self.client.session.get_adapter("http://localhost:3001/health")
+        
+        self.assertEqual(adapter.max_retries.total, 2)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+        self.assertEqual(self.client.session.headers["Connection"], "keep-alive")
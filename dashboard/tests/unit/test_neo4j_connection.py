@@ -5,17 +5,17 @@ Tests database connectivity and query execution with mocked dependencies
 """
 
 import unittest
-import sys
-import os
+import pytest
 from unittest.mock import Mock, patch, MagicMock
 
-# Add dashboard directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
-
-try:
-    from neo4j_connection import Neo4jConnection
-except ImportError as e:
-    print(f"Warning: Could not import neo4j_connection: {e}")
+neo4j_exceptions = pytest.importorskip("neo4j.exceptions")
+neo4j_connection = pytest.importorskip("neo4j_connection")
+ClientError = neo4j_exceptions.ClientError
+ServiceUnavailable = neo4j_exceptions.ServiceUnavailable
+Neo4jConnection = neo4j_connection.Neo4jConnection
+records_to_frame = neo4j_connection.records_to_frame
+GRAPH_STATISTICS_QUERY = neo4j_connection.GRAPH_STATISTICS_QUERY
+APOC_STATISTICS_QUERY = neo4j_connection.APOC_STATISTICS_QUERY
 
 
 class TestNeo4jConnection(unittest.TestCase):
@@ -30,54 +30,87 @@ class TestNeo4jConnection(unittest.TestCase):
         self.mock_driver.session.return_value.__enter__ = Mock(return_value=self.mock_session)
         self.mock_driver.session.return_value.__exit__ = Mock(return_value=None)
         
-    @patch('neo4j_connection.GraphDatabase.driver')
-    def test_connection_initialization(self, mock_driver):
+        # One patcher started per test instead of a decorator on every method
+        patcher = patch('neo4j_connection.GraphDatabase.driver', return_value=self.mock_driver)
+        self.mock_graph_driver = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_connection_initialization(self):
         """Test Neo4j connection initialization"""
-        mock_driver.return_value = self.mock_driver
         
         conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
         
-        mock_driver.assert_called_once_with("bolt://localhost:7687", auth=("neo4j", "password"))
+        self.mock_graph_driver.assert_called_once_with(
+            "bolt://localhost:7687",
+            auth=("neo4j", "password"),
+            max_connection_pool_size=10,
+            connection_acquisition_timeout=2
+        )
         self.assertIsNotNone(conn)
     
-    @patch('neo4j_connection.GraphDatabase.driver')
-    def test_execute_query(self, mock_driver):
+    def test_execute_query(self):
         """Test query execution"""
-        mock_driver.return_value = self.mock_driver
         
-        # Mock query result - return list of records, each with .data() method
+        # Mock query result - (records, summary, keys), each record with .data()
         mock_record = Mock()
         mock_record.data.return_value = {"count": 42}
-        self.mock_session.run.return_value = [mock_record]
+        self.mock_driver.execute_query.return_value = ([mock_record], Mock(), ["count"])
         
         conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
         result = conn.execute_query("MATCH (n) RETURN count(n) as count")
         
         self.assertEqual(result, [{"count": 42}])
-        self.mock_session.run.assert_called_once()
+        self.mock_driver.execute_query.assert_called_once_with(
+            "MATCH (n) RETURN count(n) as count", {}, database_="neo4j"
+        )
     
-    @patch('neo4j_connection.GraphDatabase.driver')
-    def test_graph_statistics(self, mock_driver):
+    def test_iter_query(self):
+        """Test streaming query execution"""
+        
+        records = [Mock(), Mock()]
+        records[0].data.return_value = {"name": "a"}
+        records[1].data.return_value = {"name": "b"}
+        self.mock_session.run.return_value = iter(records)
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        rows = conn.iter_query("MATCH (n) RETURN n.name as name")
+        
+        # Nothing is sent until the generator is consumed
+        self.mock_session.run.assert_not_called()
+        self.assertEqual(list(rows), [{"name": "a"}, {"name": "b"}])
+        self.mock_driver.session.assert_called_once_with(database="neo4j", fetch_size=1000)
+    
+    def test_execute_queries(self):
+        """Test independent queries run and return keyed results"""
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.execute_query = Mock(side_effect=lambda query, params=None: [{"query": query, "params": params}])
+        
+        results = conn.execute_queries({
+            "plain": "RETURN 1",
+            "with_params": ("RETURN $x", {"x": 2})
+        })
+        
+        self.assertEqual(results["plain"], [{"query": "RETURN 1", "params": None}])
+        self.assertEqual(results["with_params"], [{"query": "RETURN $x", "params": {"x": 2}}])
+        self.assertEqual(conn.execute_queries({}), {})
+    
+    def test_graph_statistics(self):
         """Test graph statistics calculation"""
-        mock_driver.return_value = self.mock_driver
-        
-        # Mock statistics results
-        def mock_execute_query(query, params=None):
-            if "count(n)" in query:
-                return [{"count": 100}]
-            elif "count(r)" in query:
-                return [{"count": 50}]
-            elif "DISTINCT labels" in query:
-                return [{"count": 5}]
-            elif "DISTINCT type" in query:
-                return [{"count": 3}]
-            return [{"count": 0}]
         
+        # Mock statistics results - all four counts come back in one row
         conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
-        conn.execute_query = mock_execute_query
+        conn.execute_query = Mock(return_value=[{
+            "node_count": 100,
+            "relationship_count": 50,
+            "label_count": 5,
+            "relationship_type_count": 3
+        }])
         
         stats = conn.get_graph_statistics()
         
+        conn.execute_query.assert_called_once()
+        
         expected_stats = {
             "node_count": 100,
             "relationship_count": 50,
@@ -85,7 +118,156 @@ class TestNeo4jConnection(unittest.TestCase):
             "relationship_type_count": 3
         }
         self.assertEqual(stats, expected_stats)
+    
+    def test_graph_statistics_without_apoc(self):
+        """Test statistics fall back to plain Cypher when APOC is missing"""
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.execute_query = Mock(side_effect=[
+            ClientError.hydrate(code="Neo.ClientError.Procedure.ProcedureNotFound",
+                                message="There is no procedure with the name `apoc.meta.stats`"),
+            [{"node_count": 7, "relationship_count": 4, "label_count": 2, "relationship_type_count": 1}],
+            [{"node_count": 7, "relationship_count": 4, "label_count": 2, "relationship_type_count": 1}]
+        ])
+        
+        stats = conn.get_graph_statistics()
+        self.assertEqual(stats["node_count"], 7)
+        
+        # APOC is not retried once it is known to be missing
+        conn.get_graph_statistics()
+        self.assertEqual(conn.execute_query.call_count, 3)
+        
+        # The fallback is still one round-trip, with every count in a CALL subquery
+        fallback_query = conn.execute_query.call_args[0][0]
+        self.assertEqual(fallback_query, GRAPH_STATISTICS_QUERY)
+        self.assertEqual(fallback_query.count("CALL {"), 4)
+    
+    def test_graph_statistics_keep_apoc_after_transient_error(self):
+        """Test a failure other than a missing procedure doesn't disable APOC"""
+        
+        row = {"node_count": 7, "relationship_count": 4, "label_count": 2, "relationship_type_count": 1}
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.execute_query = Mock(side_effect=[
+            ClientError("failed to obtain a connection from the pool within 2s"),
+            [row],
+            [row]
+        ])
+        
+        conn.get_graph_statistics()
+        conn.get_graph_statistics()
+        
+        self.assertTrue(conn._apoc_available)
+        self.assertEqual(conn.execute_query.call_args[0][0], APOC_STATISTICS_QUERY)
+    
+    def test_graph_metrics(self):
+        """Test degree and density are derived from the statistics"""
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.get_graph_statistics = Mock(return_value={"node_count": 5, "relationship_count": 10})
+        
+        metrics = conn.calculate_graph_metrics()
+        self.assertEqual(metrics["avg_degree"], 4.0)
+        self.assertEqual(metrics["density"], 0.5)
+        
+        # Empty and single-node graphs have no density instead of dividing by zero
+        conn.get_graph_statistics = Mock(return_value={"node_count": 1, "relationship_count": 0})
+        self.assertEqual(conn.calculate_graph_metrics()["density"], 0.0)
 
+    
+    def test_ensure_indexes_tolerates_read_only_users(self):
+        """Test index creation failures do not break the connection"""
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.execute_query = Mock(side_effect=ClientError("Schema operations are not allowed"))
+        
+        conn.ensure_indexes()
+        self.assertTrue(conn.execute_query.called)
+    
+    def test_warm_query_plans(self):
+        """Test plans are warmed with EXPLAIN and planning failures are skipped"""
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.execute_query = Mock(side_effect=[ClientError("No such index"), []])
+        
+        conn.warm_query_plans([
+            ("MATCH (a:Agent) USING INDEX a:Agent(id) RETURN a", {}),
+            ("MATCH (n) RETURN n LIMIT $limit", {"limit": 25})
+        ])
+        
+        conn.execute_query.assert_called_with("EXPLAIN MATCH (n) RETURN n LIMIT $limit", {"limit": 25})
 
-if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    
+    def test_recent_activity_compound_cursor(self):
+        """Test activity pages resume after the last (created_at, element_id) shown"""
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.iter_query = Mock(return_value=iter([
+            {"type": "PullRequest", "name": "PR two", "created_at": "2024-01-01T00:00:00Z", "element_id": "4:x:1"}
+        ]))
+        
+        activity = conn.get_recent_activity(limit=10, cursor=("2024-01-01T00:00:00Z", "4:x:2"))
+        
+        query, params = conn.iter_query.call_args[0]
+        self.assertIn("ORDER BY n.created_at DESC, element_id DESC", query)
+        self.assertEqual(params["cursor"], {"created_at": "2024-01-01T00:00:00Z", "element_id": "4:x:2"})
+        self.assertEqual(activity["element_id"].tolist(), ["4:x:1"])
+    
+    def test_growth_data_from_snapshot(self):
+        """Test growth data accumulates daily counts into an in-memory snapshot"""
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.iter_query = Mock(return_value=iter([
+            {"day": "2024-01-01", "count": 2},
+            {"day": "2024-01-02", "count": 3}
+        ]))
+        self.assertIsNone(conn.get_growth_data())
+        
+        self.assertTrue(conn.refresh_growth_snapshot())
+        growth = conn.get_growth_data()
+        
+        self.assertEqual(conn.iter_query.call_args[0][0], neo4j_connection.GROWTH_QUERY)
+        self.assertEqual(growth["cumulative_count"].tolist(), [2, 5])
+        
+        # A failed refresh keeps serving the last snapshot
+        conn.iter_query = Mock(side_effect=ServiceUnavailable("offline"))
+        self.assertFalse(conn.refresh_growth_snapshot())
+        self.assertIs(conn.get_growth_data(), growth)
+    
+    def test_growth_refresh_runs_in_background(self):
+        """Test the growth snapshot is computed off the request thread until closed"""
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        conn.iter_query = Mock(return_value=iter([{"day": "2024-01-01", "count": 2}]))
+        
+        conn.start_growth_refresh(interval=60)
+        conn.close()
+        conn._growth_thread.join(timeout=5)
+        
+        self.assertFalse(conn._growth_thread.is_alive())
+        self.assertEqual(conn.get_growth_data()["cumulative_count"].tolist(), [2])
+    
+    def test_queries_target_configured_database(self):
+        """Test queries name the configured database"""
+        self.mock_driver.execute_query.return_value = ([], Mock(), [])
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password", database="analytics")
+        conn.execute_query("RETURN 1")
+        
+        self.assertEqual(self.mock_driver.execute_query.call_args[1]["database_"], "analytics")
+    
+    def test_health_check_offline(self):
+        """Test an unreachable server reports every component as down"""
+        self.mock_driver.verify_connectivity.side_effect = ServiceUnavailable("Connection refused")
+        
+        conn = Neo4jConnection("bolt://localhost:7687", "neo4j", "password")
+        health = conn.check_health()
+        
+        self.assertFalse(any(health.values()))
+    
+    def test_records_to_frame(self):
+        """Test records are assembled column by column"""
+        df = records_to_frame(iter([{"type": "Agent", "count": 2}, {"type": "Task", "count": 5}]))
+        
+        self.assertEqual(list(df.columns), ["type", "count"])
+        self.assertEqual(df["count"].tolist(), [2, 5])
+        self.assertTrue(records_to_frame([]).empty)
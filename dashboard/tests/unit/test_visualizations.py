@@ -5,18 +5,39 @@ Tests chart generation and data processing with mocked dependencies
 """
 
 import unittest
-import sys
-import os
-from unittest.mock import Mock
-import pandas as pd
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
 
-# Add dashboard directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+visualizations = pytest.importorskip("visualizations")
+GraphVisualizer = visualizations.GraphVisualizer
+_layout = visualizations._layout
 
-try:
-    from visualizations import GraphVisualizer
-except ImportError as e:
-    print(f"Warning: Could not import visualizations: {e}")
+
+class CallRecorder:
+    """Callable stub returning a canned value and recording its calls"""
+    
+    def __init__(self, return_value=None):
+        self.return_value = return_value
+        self.calls = []
+    
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self.return_value
+    
+    def assert_called_once(self):
+        assert len(self.calls) == 1, f"Expected 1 call, got {len(self.calls)}"
+
+
+def iter_rows(rows):
+    """Generator over canned rows, standing in for a driver cursor"""
+    yield from rows
+
+
+def graph_row(sid, rtype, tid, sname=None, tname=None, stype="PullRequest", ttype="Task"):
+    """One flat row in the shape GRAPH_QUERY returns"""
+    return {"sid": sid, "sname": sname, "stype": stype, "sdesc": None, "rtype": rtype,
+            "tid": tid, "tname": tname, "ttype": ttype, "tdesc": None}
 
 
 class TestGraphVisualizer(unittest.TestCase):
@@ -24,7 +45,12 @@ class TestGraphVisualizer(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures"""
-        self.mock_neo4j = Mock()
+        # Plain data stub; the visualizer only ever calls execute_query
+        self.mock_neo4j = SimpleNamespace(execute_query=CallRecorder([]))
+        # Streaming reads go through the same recorder, one row at a time
+        self.mock_neo4j.iter_query = lambda query, params=None: iter_rows(
+            self.mock_neo4j.execute_query(query, params)
+        )
         self.visualizer = GraphVisualizer(self.mock_neo4j)
     
     def test_get_node_types(self):
@@ -64,14 +90,336 @@ class TestGraphVisualizer(unittest.TestCase):
             {"PR": "PR-001", "Action": "IMPLEMENTS", "Target": "Task", "Count": 1},
             {"PR": "PR-002", "Action": "DEPENDS_ON", "Target": "PR", "Count": 1}
         ]
-        self.mock_neo4j.execute_query.return_value = mock_data
+        self.mock_neo4j.execute_query.return_value = [{"pr_workflow": mock_data, "agent_coordination": []}]
+        
+        import pandas as pd
         
         result = self.visualizer.get_pr_workflow()
+        coordination = self.visualizer.get_agent_coordination()
         
         self.assertIsInstance(result, pd.DataFrame)
-        if not result.empty:
-            self.assertEqual(len(result), 2)
-
+        self.assertEqual(len(result), 2)
+        self.assertTrue(coordination.empty)
+        # Both aggregates come from the one cached bootstrap query
+        self.mock_neo4j.execute_query.assert_called_once()
 
-if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    
+    def test_graph_filters_are_parameters(self):
+        """Test user filters reach Neo4j as parameters, not Cypher text"""
+        self.visualizer._fetch_graph(["Agent"], [], 50, "x' OR 1=1 //")
+        
+        (query, params), _ = self.mock_neo4j.execute_query.calls[0]
+        self.assertNotIn("OR 1=1", query)
+        self.assertEqual(params, {"types": ["Agent"], "rels": None, "search": "x' OR 1=1 //",
+                                  "lucene": "*x'\\ OR\\ 1=1\\ \\/\\/*", "limit": 50})
+    
+    def test_search_uses_fulltext_index(self):
+        """Test search goes through the fulltext index, scanning only once it's missing"""
+        calls = []
+        
+        def execute_query(query, params=None):
+            calls.append(query)
+            if "fulltext" in query:
+                raise visualizations.ClientError("no such index")
+            return []
+        self.visualizer.neo4j = SimpleNamespace(
+            iter_query=lambda query, params=None: iter_rows(execute_query(query, params))
+        )
+        
+        self.visualizer._fetch_graph(["PullRequest"], [], 50, "PR")
+        self.visualizer._fetch_graph(["Task"], [], 50, "Task")
+        
+        self.assertEqual(calls, [visualizations.SEARCH_GRAPH_QUERY, visualizations.GRAPH_QUERY,
+                                 visualizations.GRAPH_QUERY])
+    
+    def test_search_scans_labels_outside_index(self):
+        """Test search over unindexed or unfiltered labels keeps the CONTAINS scan"""
+        self.visualizer._fetch_graph(["PRWorkflow"], [], 50, "pr_1")
+        self.visualizer._fetch_graph(["PullRequest", "PRWorkflow"], [], 50, "pr_1")
+        self.visualizer._fetch_graph([], [], 50, "pr_1")
+        
+        queries = [args[0] for args, _ in self.mock_neo4j.execute_query.calls]
+        self.assertEqual(queries, [visualizations.GRAPH_QUERY] * 3)
+    
+    def test_interactive_graph_layouts(self):
+        """Test every vis.js layout renders, including the non-physics ones"""
+        self.mock_neo4j.execute_query.return_value = [
+            graph_row("a", "LINKS", "b")
+        ]
+        
+        for layout in ["Force-directed", "Hierarchical", "Circular", "Random"]:
+            with self.subTest(layout=layout):
+                html = self.visualizer.create_interactive_graph(["Agent"], [], layout=layout)
+                self.assertIn('"id":"b"', html)
+        
+        self.assertIn('"hierarchical"', self.visualizer.create_interactive_graph(["Agent"], [], layout="Hierarchical"))
+    
+    def test_graph_stream_stops_at_byte_budget(self):
+        """Test graph rows stop streaming once the payload budget is spent"""
+        self.mock_neo4j.execute_query.return_value = [
+            graph_row(f"pr-{i}", "LINKS", f"pr-{i + 1}", sname="x" * 100) for i in range(50)
+        ]
+        
+        with patch.object(visualizations, "GRAPH_MAX_BYTES", 1000):
+            rows = self.visualizer._fetch_graph([], [], 50, "")
+        
+        self.assertGreater(len(rows), 0)
+        self.assertLess(len(rows), 10)
+        self.assertTrue(self.visualizer.graph_truncated([], [], 50, ""))
+        self.assertFalse(self.visualizer.graph_truncated([], [], 5, ""))
+    
+    def test_neighborhood_graph(self):
+        """Test expanding a node fetches only its neighborhood"""
+        self.mock_neo4j.execute_query.return_value = [
+            graph_row("pr-1", "IMPLEMENTS", "t-1", sname="PR one", tname="Task")
+        ]
+        
+        html = self.visualizer.create_neighborhood_graph("pr-1", limit=20)
+        
+        (query, params), _ = self.mock_neo4j.execute_query.calls[0]
+        self.assertEqual(query, visualizations.NEIGHBORHOOD_QUERY)
+        self.assertIn("elementId(n) = $node_id", query)
+        self.assertEqual(params, {"node_id": "pr-1", "limit": 20})
+        self.assertEqual(html.count('"shape":"dot"'), 2)
+    
+    def test_neighborhood_falls_back_to_unindexed_labels(self):
+        """Test a node id outside the indexed labels is found by a scan"""
+        queries = []
+        
+        def execute_query(query, params=None):
+            queries.append(query)
+            if query == visualizations.NEIGHBORHOOD_SCAN_QUERY:
+                return [graph_row("pr_1", "NEXT", "pr_2", stype="PRWorkflow", ttype="PRWorkflow")]
+            return []
+        self.visualizer.neo4j = SimpleNamespace(
+            iter_query=lambda query, params=None: iter_rows(execute_query(query, params))
+        )
+        
+        rows = self.visualizer._fetch_neighborhood("pr_1", 20)
+        
+        self.assertEqual(queries, [visualizations.NEIGHBORHOOD_QUERY, visualizations.NEIGHBORHOOD_SCAN_QUERY])
+        self.assertEqual(rows[0]["sid"], "pr_1")
+    
+    def test_graph_rows_are_cached_per_filter_set(self):
+        """Test equal filter sets reuse rows until the cache is invalidated"""
+        self.visualizer._fetch_graph(["Agent", "Task"], [], 50, "")
+        self.visualizer._fetch_graph(["Task", "Agent"], [], 50, "")
+        self.assertEqual(len(self.mock_neo4j.execute_query.calls), 1)
+        
+        self.visualizer.invalidate_cache()
+        self.visualizer._fetch_graph(["Agent", "Task"], [], 50, "")
+        self.assertEqual(len(self.mock_neo4j.execute_query.calls), 2)
+    
+    def test_dashboard_bootstrap(self):
+        """Test filter options and process-flow data come from one query"""
+        self.mock_neo4j.execute_query.return_value = [{
+            "node_types": ["Agent", "PullRequest"],
+            "relationship_types": ["IMPLEMENTS"],
+            "pr_workflow": [{"PR": "PR-001", "Action": "IMPLEMENTS", "Target": "Task", "Count": 1}],
+            "agent_coordination": []
+        }]
+        
+        bootstrap = self.visualizer.dashboard_bootstrap()
+        
+        self.mock_neo4j.execute_query.assert_called_once()
+        self.assertEqual(bootstrap["node_types"], ["Agent", "PullRequest"])
+        self.assertEqual(len(bootstrap["pr_workflow"]), 1)
+        self.assertTrue(bootstrap["agent_coordination"].empty)
+    
+    def test_dashboard_bootstrap_clause_order(self):
+        """Test no WITH in the bootstrap query puts ORDER BY after WHERE"""
+        # Cypher 5 only accepts WITH ... ORDER BY ... WHERE, and the mocked
+        # driver never parses the query
+        for clause in visualizations.DASHBOARD_BOOTSTRAP_QUERY.split("WITH ")[1:]:
+            clause = clause.split("RETURN")[0]
+            if "WHERE" in clause and "ORDER BY" in clause:
+                self.assertLess(clause.index("ORDER BY"), clause.index("WHERE"))
+    
+    def test_sankey_links_index_labels(self):
+        """Test Sankey links point at the right node labels"""
+        import pandas as pd
+        
+        workflow_data = pd.DataFrame([
+            {"PR": "PR-002", "Action": "IMPLEMENTS", "Target": "Task", "Count": 1},
+            {"PR": "PR-001", "Action": "DEPENDS_ON", "Target": "PR-002", "Count": 3}
+        ])
+        
+        sankey = self.visualizer.create_sankey_diagram(workflow_data).data[0]
+        
+        labels = sankey.node.label
+        self.assertEqual(sorted(labels), ["PR-001", "PR-002", "Task"])
+        links = list(zip(sankey.link.source, sankey.link.target))
+        self.assertEqual([(labels[s], labels[t]) for s, t in links],
+                         [("PR-002", "Task"), ("PR-001", "PR-002")])
+    
+    def test_empty_figures_are_shared(self):
+        """Test empty inputs reuse one prebuilt placeholder figure"""
+        import pandas as pd
+        
+        first = self.visualizer.create_sankey_diagram(pd.DataFrame())
+        second = self.visualizer.create_sankey_diagram(pd.DataFrame())
+        
+        self.assertIs(first, second)
+        self.assertEqual(first.layout.annotations[0].text, "No workflow data available")
+        self.assertIsNot(self.visualizer.create_flow_diagram(pd.DataFrame()), first)
+        self.assertEqual(len(self.visualizer.create_metrics_chart({}).data), 0)
+    
+    def test_static_figures_render_once(self):
+        """Test static mode exports SVG and reuses it for identical figures"""
+        visualizations._svg_from_json.cache_clear()
+        metrics = {"Nodes": 6, "Edges": 3}
+        
+        to_image = CallRecorder(b"<svg/>")
+        with patch.object(visualizations.pio, "to_image", to_image):
+            first = self.visualizer.create_metrics_chart(metrics, static=True)
+            second = self.visualizer.create_metrics_chart(metrics, static=True)
+        
+        self.assertEqual(first, b"<svg/>")
+        self.assertEqual(second, first)
+        to_image.assert_called_once()
+        self.assertEqual(to_image.calls[0][1]["format"], "svg")
+    
+    def test_flow_diagram_layout(self):
+        """Test the coordination diagram places every agent"""
+        import pandas as pd
+        
+        coord_data = pd.DataFrame([
+            {"Source": "planner", "Interaction": "DELEGATES", "Target": "coder", "Weight": 2},
+            {"Source": "coder", "Interaction": "REPORTS", "Target": "reviewer", "Weight": 1}
+        ])
+        
+        fig = self.visualizer.create_flow_diagram(coord_data)
+        
+        node_trace = fig.data[-1]
+        self.assertEqual(node_trace.type, "scattergl")
+        self.assertEqual(sorted(node_trace.customdata), ["coder", "planner", "reviewer"])
+        self.assertEqual(len(fig.data), 3)
+        self.assertEqual(fig.layout.annotations[0].text, "coder")
+    
+    def test_flow_diagram_uses_igraph_layout(self):
+        """Test igraph positions are used when igraph is installed"""
+        import pandas as pd
+        
+        coord_data = pd.DataFrame([
+            {"Source": "planner", "Interaction": "DELEGATES", "Target": "coder", "Weight": 2}
+        ])
+        layout = SimpleNamespace(coords=[[0.0, 1.0], [2.0, 3.0]])
+        graph = SimpleNamespace(vs={"name": ["planner", "coder"]},
+                                layout_fruchterman_reingold=CallRecorder(layout))
+        fake_igraph = SimpleNamespace(Graph=SimpleNamespace(TupleList=CallRecorder(graph)))
+        
+        with patch.object(visualizations, "ig", fake_igraph):
+            fig = self.visualizer.create_flow_diagram(coord_data)
+        
+        fake_igraph.Graph.TupleList.assert_called_once()
+        self.assertEqual(fake_igraph.Graph.TupleList.calls[0][0][0], [("planner", "coder")])
+        node_trace = fig.data[-1]
+        self.assertEqual(list(node_trace.x), [0.0, 2.0])
+        self.assertEqual(list(node_trace.y), [1.0, 3.0])
+    
+    def test_flow_diagram_buckets_edges(self):
+        """Test coordination edges share traces by weight bucket"""
+        import pandas as pd
+        
+        coord_data = pd.DataFrame([
+            {"Source": f"agent-{i}", "Interaction": "DELEGATES", "Target": f"agent-{i + 1}", "Weight": i + 1}
+            for i in range(20)
+        ])
+        
+        fig = self.visualizer.create_flow_diagram(coord_data)
+        
+        edge_traces = fig.data[:-1]
+        self.assertEqual(len(edge_traces), visualizations.EDGE_WIDTH_BUCKETS)
+        self.assertEqual(sum(len(trace.x) for trace in edge_traces), 20 * 3)
+        self.assertEqual(len(fig.layout.annotations), visualizations.FLOW_LABEL_TOP_K)
+    
+    def test_flow_diagram_keeps_outlier_width(self):
+        """Test a heavy edge isn't bucketed with, and drawn like, the light ones"""
+        import pandas as pd
+        
+        coord_data = pd.DataFrame([
+            {"Source": f"agent-{i}", "Interaction": "DELEGATES", "Target": f"agent-{i + 1}", "Weight": weight}
+            for i, weight in enumerate([1, 1, 1, 1, 1, 100])
+        ])
+        
+        fig = self.visualizer.create_flow_diagram(coord_data)
+        
+        widths = sorted(trace.line.width for trace in fig.data[:-1])
+        self.assertEqual(widths, [1, 100])
+    
+    def test_interactive_graph_nodes_and_edges(self):
+        """Test the vis.js graph carries each node once and every edge"""
+        self.mock_neo4j.execute_query.return_value = [
+            graph_row("pr-1", "IMPLEMENTS", "t-1", sname="PR one", tname="Task"),
+            graph_row("pr-1", "DEPENDS_ON", "pr-2", sname="PR one", tname="")
+        ]
+        
+        html = self.visualizer.create_interactive_graph(["PullRequest"], [])
+        
+        self.assertEqual(html.count('"shape":"dot"'), 3)
+        self.assertIn('"label":"pr-2"', html)
+        self.assertEqual(html.count('"arrows":"to"'), 2)
+        # Relationship type and node label come straight from the query columns
+        self.assertIn('"label":"DEPENDS_ON"', html)
+        self.assertIn('"title":"PullRequest (id pr-1)"', html)
+        self.assertIn('"color":"#FF6B6B"', html)
+    
+    def test_interactive_graph_escapes_script_close(self):
+        """Test node names can't terminate the inline script block"""
+        self.mock_neo4j.execute_query.return_value = [
+            graph_row("a", "LINKS", "b", sname="</script><script>alert(1)", tname="b")
+        ]
+        
+        html = self.visualizer.create_interactive_graph(["Agent"], [])
+        
+        self.assertNotIn("</script><script>alert", html)
+        self.assertIn("<\\/script>", html)
+    
+    def test_webgl_graph(self):
+        """Test WebGL graph merges edges into a single trace"""
+        self.mock_neo4j.execute_query.return_value = [
+            graph_row("pr-1", "IMPLEMENTS", "t-1", sname="PR one", tname="Task"),
+            graph_row("pr-1", "DEPENDS_ON", "pr-2", sname="PR one", tname="PR two")
+        ]
+        
+        fig = self.visualizer.create_webgl_graph(["PullRequest"], [], layout="Hierarchical")
+        
+        edge_trace, node_trace = fig.data
+        self.assertEqual(edge_trace.type, "scattergl")
+        self.assertEqual(len(edge_trace.x), 6)
+        self.assertEqual(len(node_trace.x), 3)
+    
+    def test_non_string_description_in_title(self):
+        """Test numeric and list descriptions still render in the hover title"""
+        row = graph_row("pr-1", "LINKS", "t-1")
+        row["sdesc"], row["tdesc"] = 42, ["a", "b"]
+        self.mock_neo4j.execute_query.return_value = [row]
+        
+        nodes, _ = self.visualizer._collect_graph(self.visualizer._fetch_graph([], [], 50, ""))
+        
+        self.assertEqual(nodes["pr-1"]["title"], "PullRequest (id pr-1): 42")
+        self.assertEqual(nodes["t-1"]["title"], "Task (id t-1): ['a', 'b']")
+    
+    def test_webgl_graph_mixed_id_types(self):
+        """Test integer and string node ids lay out together"""
+        self.mock_neo4j.execute_query.return_value = [
+            graph_row(1, "LINKS", "t-1"),
+            graph_row("pr-2", "LINKS", 3)
+        ]
+        
+        fig = self.visualizer.create_webgl_graph(["PullRequest"], [])
+        
+        _, node_trace = fig.data
+        self.assertEqual(len(node_trace.x), 4)
+    
+    def test_webgl_graph_reuses_layout(self):
+        """Test regenerating the same subgraph hits the layout cache"""
+        self.mock_neo4j.execute_query.return_value = [
+            graph_row("a", "LINKS", "b")
+        ]
+        _layout.cache_clear()
+        
+        self.visualizer.create_webgl_graph(["Agent"], [])
+        self.visualizer.create_webgl_graph(["Agent"], [])
+        
+        self.assertEqual(_layout.cache_info().hits, 1)
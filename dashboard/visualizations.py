@@ -1,172 +1,538 @@
 import networkx as nx
 import plotly.graph_objects as go
 import plotly.express as px
-from pyvis.network import Network
+import plotly.io as pio
+from jinja2 import Template
 import pandas as pd
-from typing import List, Dict, Any, Optional
+import numpy as np
+from typing import List, Dict, Any, Optional, Union
 import json
-import tempfile
-import os
+import sys
+from contextlib import closing
+from functools import lru_cache
+from types import MappingProxyType
+import threading
+from cachetools import TTLCache
+from neo4j.exceptions import ClientError
+from neo4j_connection import GRAPH_LABELS
+
+try:
+    import igraph as ig
+except ImportError:
+    # Optional: faster force-directed layouts for the coordination graph
+    ig = None
+
+try:
+    import orjson
+except ImportError:
+    # Optional: faster serialization of the vis.js node and edge arrays
+    orjson = None
+
+_MISSING = object()
+
+class _StreamedRows(list):
+    # Rows from _stream_rows; truncated is set when GRAPH_MAX_BYTES cut them short
+    truncated = False
+
+def _to_json(value: Any) -> str:
+    if orjson is not None:
+        text = orjson.dumps(value).decode()
+    else:
+        text = json.dumps(value, separators=(',', ':'))
+    # The JSON is inlined in a <script> block, so a node name can't close it
+    return text.replace('</', '<\\/')
+
+def _force_layout(nodes: List[Any], edges: List[tuple]) -> Dict[Any, Any]:
+    # igraph's Fruchterman-Reingold runs in C; networkx's is pure Python, so
+    # the networkx graph is only built when igraph isn't installed
+    if ig is None or not edges:
+        G = nx.DiGraph()
+        G.add_nodes_from(nodes)
+        G.add_edges_from(edges)
+        return nx.spring_layout(G, k=2, iterations=50)
+    
+    g = ig.Graph.TupleList(edges, directed=True)
+    coords = g.layout_fruchterman_reingold(niter=50).coords
+    return dict(zip(g.vs['name'], coords))
+
+# Shared, read-only label colours; visualizers are rebuilt on every rerun
+_COLOR_MAP = MappingProxyType({
+    'PullRequest': '#FF6B6B',
+    'Agent': '#4ECDC4',
+    'Task': '#45B7D1',
+    'Knowledge': '#96CEB4',
+    'Memory': '#FFEAA7',
+    'Plugin': '#DDA0DD',
+    'Tool': '#98D8C8',
+    'Workflow': '#F7DC6F'
+})
+
+# Graph rows come back as flat scalars per endpoint, so nothing is unpacked
+# from node dicts in Python. Nodes without an id property fall back to elementId
+_GRAPH_RETURN = """
+RETURN coalesce(n.id, elementId(n)) AS sid, n.name AS sname, labels(n)[0] AS stype,
+       n.description AS sdesc, type(r) AS rtype,
+       coalesce(m.id, elementId(m)) AS tid, m.name AS tname, labels(m)[0] AS ttype,
+       m.description AS tdesc
+"""
+
+GRAPH_QUERY = """
+MATCH (n)-[r]->(m)
+WHERE ($types IS NULL OR any(label IN labels(n) WHERE label IN $types))
+AND ($rels IS NULL OR type(r) IN $rels)
+AND ($search = '' OR n.name CONTAINS $search OR n.id CONTAINS $search)
+WITH n, r, m
+LIMIT $limit
+""" + _GRAPH_RETURN
+
+# Same graph, but search candidates come from the node_search fulltext index
+# instead of a CONTAINS scan over every node. The index only covers
+# GRAPH_LABELS, so it's used only when every selected type is one of them
+SEARCH_GRAPH_QUERY = """
+CALL db.index.fulltext.queryNodes('node_search', $lucene) YIELD node AS n
+MATCH (n)-[r]->(m)
+WHERE ($types IS NULL OR any(label IN labels(n) WHERE label IN $types))
+AND ($rels IS NULL OR type(r) IN $rels)
+WITH n, r, m
+LIMIT $limit
+""" + _GRAPH_RETURN
+
+_LUCENE_SPECIAL = frozenset('+-&|!(){}[]^"~*?:\\/ ')
+
+def _lucene_contains(term: str) -> str:
+    # Escape Lucene syntax so the term is matched literally, as a substring
+    return "*" + "".join("\\" + c if c in _LUCENE_SPECIAL else c for c in term) + "*"
+
+# One-hop neighborhood of a single node, fetched when the user expands it
+_NEIGHBORHOOD_HOP = """
+MATCH (n)-[r]-(m)
+WITH r
+LIMIT $limit
+WITH startNode(r) AS n, r, endNode(r) AS m
+""" + _GRAPH_RETURN
+
+NEIGHBORHOOD_QUERY = f"""
+CALL {{
+    // Graph nodes are keyed by coalesce(n.id, elementId(n)), so accept either
+    MATCH (n) WHERE elementId(n) = $node_id RETURN n
+    UNION
+    MATCH (n:{'|'.join(GRAPH_LABELS)})
+    WHERE n.id IN [$node_id, toInteger($node_id)]
+    RETURN n
+}}""" + _NEIGHBORHOOD_HOP
+
+# Only tried when the indexed lookup finds nothing: other labels have no id
+# index, so this scans every node
+NEIGHBORHOOD_SCAN_QUERY = """
+MATCH (n)
+WHERE n.id IN [$node_id, toInteger($node_id)]""" + _NEIGHBORHOOD_HOP
+
+# vis.js options per layout, serialized once at import
+_LAYOUT_OPTIONS = {
+    "Force-directed": {
+        "edges": {
+            "color": {"inherit": True},
+            "smooth": {"enabled": True, "type": "dynamic"}
+        },
+        "physics": {
+            "solver": "forceAtlas2Based",
+            "forceAtlas2Based": {
+                "gravitationalConstant": -50,
+                "centralGravity": 0.01,
+                "springLength": 100,
+                "springConstant": 0.08,
+                "damping": 0.4,
+                "avoidOverlap": 0
+            },
+            "stabilization": {"enabled": True, "iterations": 1000, "fit": True}
+        }
+    },
+    "Hierarchical": {
+        "layout": {
+            "hierarchical": {
+                "enabled": True,
+                "direction": "UD",
+                "sortMethod": "directed"
+            }
+        }
+    },
+    "Circular": {
+        "layout": {
+            "randomSeed": 2,
+            "improvedLayout": True
+        },
+        "physics": {
+            "enabled": False
+        }
+    },
+    # No randomSeed, so vis.js picks a fresh one each render
+    "Random": {
+        "layout": {
+            "improvedLayout": False
+        }
+    }
+}
+
+_LAYOUT_OPTIONS_JSON = {layout: _to_json(options) for layout, options in _LAYOUT_OPTIONS.items()}
+
+# Standalone vis-network page for the interactive graph embed
+_GRAPH_TEMPLATE = Template("""<html>
+<head>
+    <meta charset="utf-8">
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css" crossorigin="anonymous" referrerpolicy="no-referrer" />
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js" crossorigin="anonymous" referrerpolicy="no-referrer"></script>
+    <style type="text/css">
+        #mynetwork {
+            width: {{ width }};
+            height: {{ height }};
+            background-color: #ffffff;
+            border: 1px solid lightgray;
+        }
+    </style>
+</head>
+<body>
+    <div id="mynetwork"></div>
+    <script type="text/javascript">
+        var nodes = new vis.DataSet({{ nodes }});
+        var edges = new vis.DataSet({{ edges }});
+        var network = new vis.Network(
+            document.getElementById('mynetwork'),
+            {nodes: nodes, edges: edges},
+            {{ options }}
+        );
+    </script>
+</body>
+</html>
+""")
+
+# Rough cap on the text a single graph render pulls from Neo4j
+GRAPH_MAX_BYTES = 1_000_000
+
+# Coordination edges are drawn in at most this many traces, one per width
+EDGE_WIDTH_BUCKETS = 5
+
+# Only the highest-degree agents get a permanent label; the rest show on hover
+FLOW_LABEL_TOP_K = 10
+
+# Everything the graph filters and process-flow page need, one subquery each
+DASHBOARD_BOOTSTRAP_QUERY = """
+CALL {
+    MATCH (n)
+    WITH DISTINCT labels(n)[0] as type
+    ORDER BY type
+    // collect() skips the null type of unlabelled nodes
+    RETURN collect(type) as node_types
+}
+CALL {
+    MATCH ()-[r]->()
+    WITH DISTINCT type(r) as type
+    ORDER BY type
+    RETURN collect(type) as relationship_types
+}
+CALL {
+    MATCH (pr:PullRequest)-[r]->(s)
+    WITH pr.name as PR, type(r) as Action, labels(s)[0] as Target, count(*) as Count
+    ORDER BY PR, Action
+    RETURN collect({PR: PR, Action: Action, Target: Target, Count: Count}) as pr_workflow
+}
+CALL {
+    MATCH (a1:Agent)-[r]->(a2:Agent)
+    WITH a1.name as Source, type(r) as Interaction, a2.name as Target, count(*) as Weight
+    ORDER BY Weight DESC
+    RETURN collect({Source: Source, Interaction: Interaction, Target: Target, Weight: Weight}) as agent_coordination
+}
+RETURN node_types, relationship_types, pr_workflow, agent_coordination
+"""
+
+@lru_cache(maxsize=16)
+def _layout(nodes: tuple, edges: tuple, layout: str) -> Dict[Any, tuple]:
+    # Keyed on the sorted node and edge tuples so regenerating the same
+    # subgraph skips the O(n^2) force-directed pass
+    G = nx.DiGraph()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+    
+    if layout == "Circular":
+        pos = nx.circular_layout(G)
+    elif layout == "Random":
+        pos = nx.random_layout(G, seed=42)
+    elif layout == "Hierarchical" and nx.is_directed_acyclic_graph(G):
+        for depth, generation in enumerate(nx.topological_generations(G)):
+            for node in generation:
+                G.nodes[node]['depth'] = depth
+        pos = nx.multipartite_layout(G, subset_key='depth', align='horizontal', scale=-1)
+    else:
+        pos = nx.spring_layout(G, seed=42)
+    
+    return {node: tuple(xy) for node, xy in pos.items()}
+
+@lru_cache(maxsize=32)
+def _svg_from_json(fig_json: str) -> bytes:
+    # Kaleido export is the slow part, so identical figures render once
+    return pio.to_image(pio.from_json(fig_json), format='svg', engine='kaleido')
+
+@lru_cache(maxsize=None)
+def _empty_figure(message: str) -> go.Figure:
+    # Built once per placeholder message and shared, so callers must not mutate it
+    return go.Figure().add_annotation(text=message, showarrow=False)
+
+def _static_svg(fig: go.Figure) -> bytes:
+    # Snapshot for viewers that don't interact - an SVG is a few KB,
+    # the Plotly.js payload several MB. Needs the optional kaleido package
+    return _svg_from_json(fig.to_json())
+
+# Query results are reused for a minute; invalidate_cache() retires them early
+QUERY_CACHE_SIZE = 128
+QUERY_CACHE_TTL = 60
 
 class GraphVisualizer:
     def __init__(self, neo4j_connection):
         self.neo4j = neo4j_connection
-        self.color_map = {
-            'PullRequest': '#FF6B6B',
-            'Agent': '#4ECDC4',
-            'Task': '#45B7D1',
-            'Knowledge': '#96CEB4',
-            'Memory': '#FFEAA7',
-            'Plugin': '#DDA0DD',
-            'Tool': '#98D8C8',
-            'Workflow': '#F7DC6F'
-        }
+        self.color_map = _COLOR_MAP
+        self._cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+        self._cache_lock = threading.Lock()
+        self._cache_version = 0
+        self._fulltext_available = True
+    
+    def invalidate_cache(self):
+        # Entries keyed on the old version are never read again and age out
+        self._cache_version += 1
+    
+    def _cached_query(self, key: tuple, query: str, params: Optional[Dict[str, Any]] = None,
+                      stream: bool = False):
+        key = (self._cache_version,) + key
+        with self._cache_lock:
+            results = self._cache.get(key, _MISSING)
+        if results is _MISSING:
+            results = self._stream_rows(query, params) if stream else self.neo4j.execute_query(query, params)
+            with self._cache_lock:
+                self._cache[key] = results
+        return results
+    
+    def _stream_rows(self, query: str, params: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Graph rows are pulled off the driver cursor as they arrive, and reading
+        # stops once the payload would pass GRAPH_MAX_BYTES, whatever the limit
+        rows, size = _StreamedRows(), 0
+        with closing(self.neo4j.iter_query(query, params)) as records:
+            for record in records:
+                size += sum(len(str(value)) for value in record.values())
+                if size > GRAPH_MAX_BYTES:
+                    rows.truncated = True
+                    break
+                rows.append(record)
+        return rows
     
     def get_node_types(self) -> List[str]:
         query = "MATCH (n) RETURN DISTINCT labels(n)[0] as type ORDER BY type"
-        results = self.neo4j.execute_query(query)
+        results = self._cached_query(("node_types",), query)
         return [r['type'] for r in results if r['type']]
     
     def get_relationship_types(self) -> List[str]:
         query = "MATCH ()-[r]->() RETURN DISTINCT type(r) as type ORDER BY type"
-        results = self.neo4j.execute_query(query)
+        results = self._cached_query(("relationship_types",), query)
         return [r['type'] for r in results if r['type']]
     
+    def _fetch_graph(self, node_types: List[str], relationship_types: List[str],
+                     limit: int, search_term: str) -> List[Dict[str, Any]]:
+        # Filters are parameters, so user input is never spliced into the Cypher
+        # and every filter combination shares one cached plan
+        params = {
+            "types": list(node_types) or None,
+            "rels": list(relationship_types) or None,
+            "search": search_term,
+            "lucene": _lucene_contains(search_term),
+            "limit": limit
+        }
+        # Order doesn't change the rows, so equal filter sets share an entry
+        key = ("graph", frozenset(node_types), frozenset(relationship_types), search_term, limit)
+        indexed = bool(node_types) and set(node_types) <= set(GRAPH_LABELS)
+        if search_term and indexed and self._fulltext_available:
+            try:
+                return self._cached_query(key, SEARCH_GRAPH_QUERY, params, stream=True)
+            except ClientError:
+                # Index not created (e.g. read-only user) - remember and scan instead
+                self._fulltext_available = False
+        return self._cached_query(key, GRAPH_QUERY, params, stream=True)
+    
+    def _fetch_neighborhood(self, node_id: str, limit: int) -> List[Dict[str, Any]]:
+        params = {"node_id": node_id, "limit": limit}
+        key = ("neighborhood", node_id, limit)
+        results = self._cached_query(key, NEIGHBORHOOD_QUERY, params, stream=True)
+        if not results:
+            results = self._cached_query(key + ("scan",), NEIGHBORHOOD_SCAN_QUERY, params, stream=True)
+        return results
+    
+    def dashboard_bootstrap(self) -> Dict[str, Any]:
+        # Filter options and both process-flow datasets in one round-trip
+        results = self._cached_query(("bootstrap",), DASHBOARD_BOOTSTRAP_QUERY)
+        row = results[0] if results else {}
+        return {
+            "node_types": row.get("node_types") or [],
+            "relationship_types": row.get("relationship_types") or [],
+            "pr_workflow": pd.DataFrame(row.get("pr_workflow") or []),
+            "agent_coordination": pd.DataFrame(row.get("agent_coordination") or [])
+        }
+    
+    def _collect_graph(self, results) -> tuple:
+        # Gather every endpoint first so ids are deduped by dict.fromkeys in one
+        # C-level pass instead of a membership test per record
+        endpoints = [
+            endpoint
+            for record in results
+            for endpoint in (
+                (record['sid'], record['sname'], record['stype'], record['sdesc']),
+                (record['tid'], record['tname'], record['ttype'], record['tdesc'])
+            )
+        ]
+        first_seen = {endpoint[0]: endpoint for endpoint in reversed(endpoints)}
+        
+        # Color and title prefix are resolved once per label, not once per node
+        styles = {}
+        nodes = {}
+        for node_id in dict.fromkeys(endpoint[0] for endpoint in endpoints):
+            _, name, node_type, description = first_seen[node_id]
+            # Labels repeat across records and key the style table - intern them
+            node_type = sys.intern(node_type) if node_type else 'Node'
+            style = styles.get(node_type)
+            if style is None:
+                style = styles[node_type] = (self.color_map.get(node_type, '#999999'), node_type + ' ')
+            # The id is what the "Expand node" box takes, so the hover shows it
+            title = f"{style[1]}(id {node_id})"
+            nodes[node_id] = {
+                'label': name or node_id,
+                'color': style[0],
+                'title': f"{title}: {description}" if description else title
+            }
+        
+        edges = [(record['sid'], record['tid'], record['rtype']) for record in results]
+        
+        return nodes, edges
+    
+    def graph_truncated(self, node_types: List[str], relationship_types: List[str],
+                        limit: int = 100, search_term: str = "") -> bool:
+        # Whether the last fetch of this graph stopped at GRAPH_MAX_BYTES short
+        # of its limit. The rows are cached, so asking doesn't re-run the query
+        results = self._fetch_graph(node_types, relationship_types, limit, search_term)
+        return getattr(results, "truncated", False)
+    
     def create_interactive_graph(self, node_types: List[str], relationship_types: List[str], 
                                layout: str = "Force-directed", limit: int = 100, 
                                search_term: str = "") -> str:
-        # Build query
-        node_filter = " OR ".join([f"n:{nt}" for nt in node_types]) if node_types else "true"
-        rel_filter = " OR ".join([f"type(r) = '{rt}'" for rt in relationship_types]) if relationship_types else "true"
-        
-        search_filter = ""
-        if search_term:
-            search_filter = f" AND (n.name CONTAINS '{search_term}' OR n.id CONTAINS '{search_term}')"
-        
-        query = f"""
-        MATCH (n)-[r]->(m)
-        WHERE ({node_filter}){search_filter}
-        AND ({rel_filter})
-        WITH n, r, m
-        LIMIT {limit}
-        RETURN n, r, m
-        """
-        
-        results = self.neo4j.execute_query(query)
-        
-        # Create PyVis network
-        net = Network(height="600px", width="100%", directed=True)
-        
-        # Configure physics based on layout
-        if layout == "Force-directed":
-            net.force_atlas_2based()
-        elif layout == "Hierarchical":
-            net.set_options("""
-            var options = {
-                "layout": {
-                    "hierarchical": {
-                        "enabled": true,
-                        "direction": "UD",
-                        "sortMethod": "directed"
-                    }
-                }
-            }
-            """)
-        elif layout == "Circular":
-            net.set_options("""
-            var options = {
-                "layout": {
-                    "randomSeed": 2,
-                    "improvedLayout": true
-                },
-                "physics": {
-                    "enabled": false
-                }
-            }
-            """)
-        elif layout == "Random":
-            net.set_options("""
-            var options = {
-                "layout": {
-                    "randomSeed": undefined,
-                    "improvedLayout": false
-                }
+        results = self._fetch_graph(node_types, relationship_types, limit, search_term)
+        return self._render_graph(results, layout)
+    
+    def create_neighborhood_graph(self, node_id: str, layout: str = "Force-directed",
+                                  limit: int = 100) -> str:
+        # Expanding one node fetches just its edges rather than the whole graph again
+        results = self._fetch_neighborhood(node_id, limit)
+        return self._render_graph(results, layout)
+    
+    def _render_graph(self, results: List[Dict[str, Any]], layout: str) -> str:
+        nodes, edges = self._collect_graph(results)
+        
+        node_list = [
+            {
+                'id': node_id,
+                'label': attrs['label'] or node_id,
+                'color': attrs['color'],
+                'title': attrs['title'],
+                'shape': 'dot'
             }
-            """)
-        else:
-            # Default fallback for unsupported layouts
-            net.force_atlas_2based()
+            for node_id, attrs in nodes.items()
+        ]
+        edge_list = [
+            {'from': source_id, 'to': target_id, 'label': rel_type, 'arrows': 'to'}
+            for source_id, target_id, rel_type in edges
+        ]
         
-        # Add nodes and edges
-        nodes_added = set()
+        # Unknown layouts fall back to ForceAtlas2 physics
+        options = _LAYOUT_OPTIONS_JSON.get(layout, _LAYOUT_OPTIONS_JSON["Force-directed"])
         
-        for record in results:
-            # Add source node
-            source = record['n']
-            source_id = source.get('id', str(source))
-            source_label = list(source.keys())[0] if isinstance(source, dict) else 'Node'
-            
-            if source_id not in nodes_added:
-                net.add_node(
-                    source_id,
-                    label=source.get('name', source_id),
-                    color=self.color_map.get(source_label, '#999999'),
-                    title=f"{source_label}: {source.get('description', '')}"
-                )
-                nodes_added.add(source_id)
-            
-            # Add target node
-            target = record['m']
-            target_id = target.get('id', str(target))
-            target_label = list(target.keys())[0] if isinstance(target, dict) else 'Node'
-            
-            if target_id not in nodes_added:
-                net.add_node(
-                    target_id,
-                    label=target.get('name', target_id),
-                    color=self.color_map.get(target_label, '#999999'),
-                    title=f"{target_label}: {target.get('description', '')}"
-                )
-                nodes_added.add(target_id)
-            
-            # Add edge
-            rel = record['r']
-            rel_type = rel if isinstance(rel, str) else 'RELATED'
-            net.add_edge(source_id, target_id, label=rel_type)
-        
-        # Generate HTML
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False) as f:
-            net.save_graph(f.name)
-            with open(f.name, 'r') as html_file:
-                html_content = html_file.read()
-            os.unlink(f.name)
-        
-        return html_content
+        return _GRAPH_TEMPLATE.render(
+            width="100%",
+            height="600px",
+            nodes=_to_json(node_list),
+            edges=_to_json(edge_list),
+            options=options
+        )
+    
+    def create_webgl_graph(self, node_types: List[str], relationship_types: List[str],
+                           layout: str = "Force-directed", limit: int = 100,
+                           search_term: str = "") -> go.Figure:
+        # Same data as create_interactive_graph, laid out server-side and drawn
+        # with WebGL traces - vis.js physics gets sluggish beyond a few hundred nodes
+        results = self._fetch_graph(node_types, relationship_types, limit, search_term)
+        nodes, edges = self._collect_graph(results)
+        
+        pos = _layout(
+            # Ids can mix int and str properties, so order by their text
+            tuple(sorted(nodes, key=str)),
+            tuple(sorted({(source, target) for source, target, _ in edges}, key=str)),
+            layout
+        )
+        
+        # All edges go into one trace, separated by None breaks
+        edge_x, edge_y = [], []
+        for source, target, _ in edges:
+            x0, y0 = pos[source]
+            x1, y1 = pos[target]
+            edge_x += [x0, x1, None]
+            edge_y += [y0, y1, None]
+        
+        edge_trace = go.Scattergl(
+            x=edge_x,
+            y=edge_y,
+            mode='lines',
+            line=dict(width=1, color='#888'),
+            hoverinfo='skip'
+        )
+        
+        node_ids = list(nodes)
+        node_trace = go.Scattergl(
+            x=[pos[node][0] for node in node_ids],
+            y=[pos[node][1] for node in node_ids],
+            mode='markers',
+            marker=dict(
+                size=10,
+                color=[nodes[node]['color'] for node in node_ids],
+                line=dict(width=1, color='white')
+            ),
+            text=[f"{nodes[node]['label']}<br>{nodes[node]['title']}" for node in node_ids],
+            hoverinfo='text'
+        )
+        
+        fig = go.Figure(data=[edge_trace, node_trace])
+        
+        fig.update_layout(
+            showlegend=False,
+            hovermode='closest',
+            margin=dict(b=0, l=0, r=0, t=0),
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            height=600
+        )
+        
+        return fig
     
     def get_pr_workflow(self) -> pd.DataFrame:
-        query = """
-        MATCH (pr:PullRequest)-[r]->(s)
-        RETURN pr.name as PR, type(r) as Action, labels(s)[0] as Target, count(*) as Count
-        ORDER BY PR, Action
-        """
-        results = self.neo4j.execute_query(query)
-        if results:
-            return pd.DataFrame(results)
-        return pd.DataFrame()
+        # Served from the bootstrap round-trip, which already aggregates it
+        return self.dashboard_bootstrap()["pr_workflow"]
     
-    def create_sankey_diagram(self, workflow_data: pd.DataFrame) -> go.Figure:
+    def create_sankey_diagram(self, workflow_data: pd.DataFrame,
+                              static: bool = False) -> Union[go.Figure, bytes]:
         if workflow_data.empty:
-            return go.Figure().add_annotation(text="No workflow data available")
+            fig = _empty_figure("No workflow data available")
+            return _static_svg(fig) if static else fig
         
-        # Create node labels
-        all_nodes = list(set(workflow_data['PR'].tolist() + 
-                           workflow_data['Target'].tolist()))
-        node_dict = {node: i for i, node in enumerate(all_nodes)}
+        # One categorical over both columns gives every node its integer index
+        n = len(workflow_data)
+        nodes = pd.Categorical(pd.concat([workflow_data['PR'], workflow_data['Target']], ignore_index=True))
+        all_nodes = nodes.categories.tolist()
         
         # Create links
         links = {
-            'source': [node_dict[pr] for pr in workflow_data['PR']],
-            'target': [node_dict[target] for target in workflow_data['Target']],
+            'source': nodes.codes[:n].tolist(),
+            'target': nodes.codes[n:].tolist(),
             'value': workflow_data['Count'].tolist(),
             'label': workflow_data['Action'].tolist()
         }
@@ -187,70 +553,83 @@ class GraphVisualizer:
             height=500
         )
         
-        return fig
+        return _static_svg(fig) if static else fig
     
     def get_agent_coordination(self) -> pd.DataFrame:
-        query = """
-        MATCH (a1:Agent)-[r]->(a2:Agent)
-        RETURN a1.name as Source, type(r) as Interaction, a2.name as Target, count(*) as Weight
-        ORDER BY Weight DESC
-        """
-        results = self.neo4j.execute_query(query)
-        if results:
-            return pd.DataFrame(results)
-        return pd.DataFrame()
+        return self.dashboard_bootstrap()["agent_coordination"]
     
-    def create_flow_diagram(self, coord_data: pd.DataFrame) -> go.Figure:
+    def create_flow_diagram(self, coord_data: pd.DataFrame,
+                            static: bool = False) -> Union[go.Figure, bytes]:
         if coord_data.empty:
-            return go.Figure().add_annotation(text="No coordination data available")
-        
-        # Create network graph
-        G = nx.from_pandas_edgelist(
-            coord_data,
-            source='Source',
-            target='Target',
-            edge_attr=['Interaction', 'Weight'],
-            create_using=nx.DiGraph()
+            fig = _empty_figure("No coordination data available")
+            return _static_svg(fig) if static else fig
+        
+        # Nodes and edges straight from the frame, in first-seen order. A repeated
+        # Source/Target pair keeps its last row, as a DiGraph would
+        edges = coord_data.drop_duplicates(['Source', 'Target'], keep='last').rename(
+            columns={'Source': 'source', 'Target': 'target'}
         )
+        node_names = pd.unique(edges[['source', 'target']].values.ravel()).tolist()
         
         # Calculate layout
-        pos = nx.spring_layout(G, k=2, iterations=50)
+        pos = _force_layout(node_names, list(zip(edges['source'], edges['target'])))
+        
+        # Line width is per trace, so edges share one trace per weight bucket
+        # rather than getting a trace each. Few distinct weights each keep their
+        # own width; otherwise buckets are log-spaced, so an outlier isn't
+        # folded into the bulk the way quantiles would fold it
+        weights = edges['Weight']
+        if weights.nunique() <= EDGE_WIDTH_BUCKETS:
+            buckets = weights
+        else:
+            buckets = pd.cut(np.log1p(weights.clip(lower=0)), bins=EDGE_WIDTH_BUCKETS, labels=False)
         
-        # Create edge traces
         edge_traces = []
-        for edge in G.edges(data=True):
-            x0, y0 = pos[edge[0]]
-            x1, y1 = pos[edge[1]]
+        for _, bucket in edges.groupby(buckets):
+            edge_x, edge_y, edge_text = [], [], []
+            for source, target, interaction, weight in zip(
+                bucket['source'], bucket['target'], bucket['Interaction'], bucket['Weight']
+            ):
+                x0, y0 = pos[source]
+                x1, y1 = pos[target]
+                edge_x += [x0, x1, None]
+                edge_y += [y0, y1, None]
+                edge_text += [f"{interaction}: {weight}"] * 2 + [None]
             
-            edge_trace = go.Scatter(
-                x=[x0, x1, None],
-                y=[y0, y1, None],
+            edge_traces.append(go.Scattergl(
+                x=edge_x,
+                y=edge_y,
                 mode='lines',
-                line=dict(width=edge[2]['Weight'], color='#888'),
+                line=dict(width=bucket['Weight'].median(), color='#888'),
                 hoverinfo='text',
-                text=f"{edge[2]['Interaction']}: {edge[2]['Weight']}",
+                text=edge_text,
                 showlegend=False
-            )
-            edge_traces.append(edge_trace)
+            ))
         
-        # Create node trace
-        node_x = [pos[node][0] for node in G.nodes()]
-        node_y = [pos[node][1] for node in G.nodes()]
+        # Create node trace - names show on hover, only the busiest get a label
+        node_x = [pos[node][0] for node in node_names]
+        node_y = [pos[node][1] for node in node_names]
         
-        node_trace = go.Scatter(
+        node_trace = go.Scattergl(
             x=node_x,
             y=node_y,
-            mode='markers+text',
-            text=[node for node in G.nodes()],
-            textposition="top center",
+            mode='markers',
+            customdata=node_names,
+            hovertemplate='%{customdata}<extra></extra>',
             marker=dict(
                 size=20,
                 color='#4ECDC4',
                 line=dict(width=2, color='white')
-            ),
-            hoverinfo='text'
+            )
         )
         
+        degree = pd.concat([edges['source'], edges['target']]).value_counts()
+        busiest = sorted(node_names, key=degree.get, reverse=True)[:FLOW_LABEL_TOP_K]
+        annotations = [
+            dict(x=pos[node][0], y=pos[node][1], text=str(node), showarrow=False, yshift=18)
+            for node in busiest
+        ]
+        
         # Create figure
         fig = go.Figure(data=edge_traces + [node_trace])
         
@@ -261,12 +640,19 @@ class GraphVisualizer:
             margin=dict(b=0, l=0, r=0, t=40),
             xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
             yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            height=500
+            height=500,
+            uirevision='static',
+            annotations=annotations
         )
         
-        return fig
+        return _static_svg(fig) if static else fig
     
-    def create_metrics_chart(self, metrics: Dict[str, Any]) -> go.Figure:
+    def create_metrics_chart(self, metrics: Dict[str, Any],
+                             static: bool = False) -> Union[go.Figure, bytes]:
+        if not metrics:
+            fig = _empty_figure("No metrics available")
+            return _static_svg(fig) if static else fig
+        
         categories = list(metrics.keys())
         values = list(metrics.values())
         
@@ -281,4 +667,4 @@ class GraphVisualizer:
             height=400
         )
         
-        return fig
\ No newline at end of file
+        return _static_svg(fig) if static else fig
\ No newline at end of file
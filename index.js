@@ -94,10 +94,8 @@ app.get('/tools', async (req, res) => {
 
 // DELETED: All profile and planning-boost endpoints (FunkBot stubs removed)
 
-app.post('/execute/:server/:tool', async (req, res) => {
-  const { server, tool } = req.params;
-  const payload = req.body;
-  
+// Runs one tool call and shapes the response shared by the single and batch endpoints
+async function runTool(server, tool, payload) {
   try {
     // Try MCP server execution first
     const result = await mcpClient.executeTool(server, tool, payload);
@@ -115,29 +113,80 @@ app.post('/execute/:server/:tool', async (req, res) => {
     // Add FunkBot Protocol 🎷🤖 metadata if present
     if (result.funkbot) {
       response.funkbot = result.funkbot;
-      
-      // Add response headers for transparent simulation state
-      if (result.funkbot.is_simulated) {
-        res.set({
-          'X-Claude-Conduit-Mode': 'simulation',
-          'X-Claude-Conduit-Warning': 'mock-data',
-          'X-Claude-Conduit-Server-Status': result.funkbot.server_status || 'degraded'
-        });
-      }
     }
     
-    res.json(response);
+    return { ok: true, response };
     
   } catch (mcpError) {
-    res.status(404).json({
-      error: 'Execution failed',
-      message: mcpError.message,
-      server,
-      tool,
-      suggestion: 'Check available servers/tools with GET /tools',
+    return {
+      ok: false,
+      response: {
+        error: 'Execution failed',
+        message: mcpError.message,
+        server,
+        tool,
+        suggestion: 'Check available servers/tools with GET /tools',
+        timestamp: new Date().toISOString()
+      }
+    };
+  }
+}
+
+app.post('/execute/:server/:tool', async (req, res) => {
+  const { server, tool } = req.params;
+  const payload = req.body;
+  
+  const { ok, response } = await runTool(server, tool, payload);
+  
+  if (!ok) {
+    return res.status(404).json(response);
+  }
+  
+  // Add response headers for transparent simulation state
+  if (response.funkbot && response.funkbot.is_simulated) {
+    res.set({
+      'X-Claude-Conduit-Mode': 'simulation',
+      'X-Claude-Conduit-Warning': 'mock-data',
+      'X-Claude-Conduit-Server-Status': response.funkbot.server_status || 'degraded'
+    });
+  }
+  
+  res.json(response);
+});
+
+// Batch execution: one HTTP request for many [{server, tool, payload}] calls.
+// Calls run concurrently; each result has the same shape as /execute/:server/:tool.
+app.post('/execute-batch', async (req, res) => {
+  const calls = req.body;
+  
+  if (!Array.isArray(calls)) {
+    return res.status(400).json({
+      error: 'Invalid batch',
+      message: 'Expected a JSON array of {server, tool, payload} objects',
       timestamp: new Date().toISOString()
     });
   }
+  
+  // Destructuring a null element would throw inside the async handler and
+  // leave the request hanging, so every element is checked up front
+  const invalid = calls.findIndex(call => call === null || typeof call !== 'object' || Array.isArray(call));
+  if (invalid !== -1) {
+    return res.status(400).json({
+      error: 'Invalid batch',
+      message: `Call ${invalid} is not a {server, tool, payload} object`,
+      timestamp: new Date().toISOString()
+    });
+  }
+  
+  const outcomes = await Promise.all(
+    calls.map(({ server, tool, payload }) => runTool(server, tool, payload || {}))
+  );
+  
+  res.json({
+    status: 'success',
+    results: outcomes.map(outcome => outcome.response),
+    timestamp: new Date().toISOString()
+  });
 });
 
 app.get('/', (req, res) => {
@@ -151,7 +200,8 @@ app.get('/', (req, res) => {
       health: 'GET /health',
       fortune: 'GET /fortune', 
       tools: 'GET /tools',
-      execute: 'POST /execute/:server/:tool'
+      execute: 'POST /execute/:server/:tool',
+      executeBatch: 'POST /execute-batch'
     },
     defaultProfile: 'senior-developer',
     timestamp: new Date().toISOString()
@@ -185,6 +235,7 @@ const server = app.listen(PORT, async () => {
   console.log('  GET  /fortune          - Educational FLOW/VIBE wisdom');
   console.log('  GET  /tools            - Available MCP servers and plugins');
   console.log('  POST /execute/:server/:tool - Execute MCP server tools');
+  console.log('  POST /execute-batch    - Execute several tools in one request');
   console.log('');
   console.log('PHILOSOPHY: VIBE - Verify, and Inspirational Behaviors Emerge');
   console.log('METHODOLOGY: FLOW - Following Logical Work Order');